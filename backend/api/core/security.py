@@ -2,8 +2,9 @@
 Security utilities for authentication
 """
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Optional, Tuple
+import jwt
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -12,13 +13,34 @@ from sqlalchemy import select
 from backend.api.core.config import settings
 from backend.api.core.database import get_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use bcrypt over a SHA-256 digest of the password, so long
+# passwords aren't silently cut at bcrypt's 72 bytes. Plain bcrypt hashes
+# still verify and are flagged for rehashing on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    bcrypt_sha256__rounds=settings.BCRYPT_ROUNDS
+)
+# Verified against when the user doesn't exist, so a failed login costs
+# the same bcrypt work whether or not the username is known
+_DUMMY_HASH = pwd_context.hash("not-a-real-password")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# Signing key encoded once rather than on every encode/decode
+SECRET_KEY_BYTES = settings.SECRET_KEY.encode()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a replacement hash if the stored one is outdated"""
+    if hashed_password is None:
+        pwd_context.verify(plain_password, _DUMMY_HASH)
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
@@ -28,14 +50,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=settings.ALGORITHM)
 
 def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=7)
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=settings.ALGORITHM)
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -50,7 +72,11 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(
+            token, SECRET_KEY_BYTES,
+            algorithms=[settings.ALGORITHM],
+            options={"require": ["exp"]}
+        )
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
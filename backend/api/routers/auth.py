@@ -4,10 +4,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import timedelta
+import asyncio
 
 from backend.api.core.database import get_db
 from backend.api.core.security import (
-    verify_password, 
+    verify_and_update_password,
     get_password_hash, 
     create_access_token,
     create_refresh_token,
@@ -34,12 +35,13 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Username or email already registered"
         )
     
-    # Create new user
+    # Create new user; bcrypt is CPU-bound, so hash off the event loop
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         role=user_data.role
     )
     db.add(db_user)
@@ -59,13 +61,25 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Unknown usernames still pay for a bcrypt verify, run in a worker
+    # thread so other requests keep being served meanwhile
+    verified, new_hash = await asyncio.to_thread(
+        verify_and_update_password,
+        form_data.password, user.hashed_password if user else None
+    )
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade legacy or lower-cost hashes now that we have the plain password
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -9,6 +9,7 @@ from pydantic import BaseModel, HttpUrl
 from typing import List, Optional
 from datetime import datetime
 import tempfile
+import asyncio
 import os
 
 from backend.api.scanner.url_extractor import URLExtractor
@@ -107,7 +108,7 @@ async def extract_batch_urls(request: BatchURLRequest):
     if not request.urls:
         raise HTTPException(status_code=400, detail="No URLs provided")
     
-    results = []
+    urls = []
     
     for url in request.urls:
         url = url.strip()
@@ -118,9 +119,14 @@ async def extract_batch_urls(request: BatchURLRequest):
         if not url.startswith(('http://', 'https://', 'ftp://')):
             url = 'https://' + url
         
-        extractor = URLExtractor(url)
-        info = extractor.extract_all_info()
-        
+        urls.append(url)
+    
+    # Lookups for all URLs run concurrently instead of one after another
+    infos = await URLExtractor.extract_many(urls)
+    
+    results = []
+    
+    for url, info in zip(urls, infos):
         if info:
             results.append({
                 "url": url,
@@ -166,7 +172,7 @@ async def deep_scan_url(request: URLRequest):
         url = 'https://' + url
     
     scanner = DeepScanner(url)
-    results = scanner.scan_all()
+    results = await scanner.scan_all_async()
     
     return results
 
@@ -187,9 +193,11 @@ async def quick_scan_url(request: URLRequest):
     
     scanner = DeepScanner(url)
     
-    # Only perform quick checks
-    ssl_result = scanner._analyze_ssl()
-    headers_result = scanner._analyze_security_headers()
+    # Only perform quick checks, off the event loop
+    ssl_result, headers_result = await asyncio.gather(
+        asyncio.to_thread(scanner._analyze_ssl),
+        asyncio.to_thread(scanner._analyze_security_headers)
+    )
     
     # Calculate quick score
     score = 0
@@ -259,12 +267,12 @@ async def analyze_pcap_file(file: UploadFile = File(...)):
     Upload and analyze a PCAP network capture file.
     Returns protocol distribution, port statistics, and IP address analysis.
     
-    Requires pyshark to be installed on the server.
+    Requires tshark to be installed on the server.
     """
     if not NetworkAnalyzer.is_available():
         raise HTTPException(
             status_code=503, 
-            detail="PCAP analysis is not available. pyshark is not installed."
+            detail="PCAP analysis is not available. tshark is not installed."
         )
     
     # Validate file type
@@ -309,7 +317,7 @@ async def check_pcap_status():
     return {
         "available": NetworkAnalyzer.is_available(),
         "message": "PCAP analysis is available" if NetworkAnalyzer.is_available() 
-                   else "pyshark is not installed. Install with: pip install pyshark"
+                   else "tshark is not installed. Install the Wireshark CLI (tshark) package"
     }
 
 
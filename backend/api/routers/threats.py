@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from typing import List, Optional
 from datetime import datetime
+import hmac
 import uuid
 import httpx
 
@@ -20,7 +21,7 @@ INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY", "fortifai-internal-service-key"
 
 async def verify_internal_service(x_internal_key: Optional[str] = Header(None, alias="X-Internal-Key")):
     """Verify internal service API key"""
-    if x_internal_key != INTERNAL_API_KEY:
+    if x_internal_key is None or not hmac.compare_digest(x_internal_key.encode(), INTERNAL_API_KEY.encode()):
         raise HTTPException(status_code=401, detail="Invalid internal service key")
     return True
 
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, update, delete
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 
 from backend.api.core.database import get_db
 from backend.api.core.security import get_current_user, get_password_hash, require_role
@@ -225,8 +226,8 @@ async def create_user(
             detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}"
         )
     
-    # Create user
-    hashed_password = get_password_hash(user_data.password)
+    # Create user; bcrypt runs in a worker thread to keep the loop free
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -428,7 +429,7 @@ async def reset_user_password(
             detail="User not found"
         )
     
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await asyncio.to_thread(get_password_hash, new_password)
     await db.commit()
     
     return {"message": "Password updated successfully"}
@@ -6,17 +6,35 @@ Originally from SubVeil - Integrated into FortifAI Security Platform
 """
 
 import os
-import re
+import shutil
+import subprocess
 import tempfile
-from typing import Optional
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Callable, Optional
 from datetime import datetime
 
-try:
-    import pyshark
-    PYSHARK_AVAILABLE = True
-except ImportError:
-    pyshark = None
-    PYSHARK_AVAILABLE = False
+TSHARK_PATH = shutil.which('tshark')
+TSHARK_AVAILABLE = TSHARK_PATH is not None
+
+# Fields streamed from tshark, in output column order
+TSHARK_FIELDS = (
+    'frame.protocols',
+    'ip.src', 'ip.dst',
+    'tcp.srcport', 'tcp.dstport',
+    'udp.srcport', 'udp.dstport'
+)
+
+# Pipe buffer for the tshark output stream
+TSHARK_PIPE_BUFFER = 1 << 20
+
+# Packets per analysis chunk, and the most IPs/ports kept between chunks
+PCAP_CHUNK_PACKETS = 10_000
+PCAP_COUNTER_LIMIT = 10_000
+
+# Uploaded captures are written out in 1 MiB slices through a 128 KiB buffer
+UPLOAD_WRITE_BLOCK = 1 << 20
+UPLOAD_WRITE_BUFFER = 1 << 17
 
 
 class NetworkAnalyzer:
@@ -27,23 +45,35 @@ class NetworkAnalyzer:
     
     @staticmethod
     def is_available() -> bool:
-        """Check if pyshark is available"""
-        return PYSHARK_AVAILABLE
+        """Check if tshark is available"""
+        return TSHARK_AVAILABLE
+    
+    @staticmethod
+    def _tshark_command(file_path: str) -> list:
+        """Build a tshark invocation that prints one tab-separated line per packet"""
+        command = [
+            TSHARK_PATH, '-r', file_path, '-n',
+            '-T', 'fields', '-E', 'separator=/t', '-E', 'occurrence=f'
+        ]
+        for field in TSHARK_FIELDS:
+            command += ['-e', field]
+        return command
     
-    def analyze_pcap(self, file_path: str) -> dict:
+    def analyze_pcap(self, file_path: str, progress: Optional[Callable[[int], None]] = None) -> dict:
         """
         Analyze a PCAP file and return protocol/port/IP statistics
         
         Args:
             file_path: Path to the PCAP file
+            progress: Optional callback receiving the packet count after each chunk
             
         Returns:
             Dictionary containing analysis results
         """
-        if not PYSHARK_AVAILABLE:
+        if not TSHARK_AVAILABLE:
             return {
                 'success': False,
-                'error': 'pyshark is not installed. Install with: pip install pyshark'
+                'error': 'tshark is not installed. Install the Wireshark CLI (tshark) package'
             }
         
         if not os.path.exists(file_path):
@@ -53,35 +83,40 @@ class NetworkAnalyzer:
             }
         
         try:
-            cap = pyshark.FileCapture(file_path, only_summaries=True)
+            state = {
+                'total_packets': 0,
+                'stack_counts': defaultdict(int),
+                'port_counts': defaultdict(int),
+                'ip_counts': defaultdict(int)
+            }
             
-            protocol_counts = {}
-            port_counts = {}
-            ip_counts = {}
-            total_packets = 0
+            packets = self._iter_packets(file_path)
+            while self._accumulate(islice(packets, PCAP_CHUNK_PACKETS), state):
+                # Keep memory bounded on huge captures by trimming the IP and
+                # port tables back to their heaviest entries between chunks
+                for key in ('port_counts', 'ip_counts'):
+                    if len(state[key]) > PCAP_COUNTER_LIMIT:
+                        state[key] = defaultdict(int, Counter(state[key]).most_common(PCAP_COUNTER_LIMIT))
+                if progress:
+                    progress(state['total_packets'])
             
-            for pkt in cap:
-                total_packets += 1
-                proto = pkt.protocol if hasattr(pkt, 'protocol') else 'UNKNOWN'
-                protocol_counts[proto] = protocol_counts.get(proto, 0) + 1
-                
-                if hasattr(pkt, 'info'):
-                    info = pkt.info
-                    # Extract IPs
-                    ip_matches = re.findall(r'(\d+\.\d+\.\d+\.\d+)', info)
-                    for ip in ip_matches:
-                        ip_counts[ip] = ip_counts.get(ip, 0) + 1
-                    # Extract ports
-                    port_matches = re.findall(r'\b(\d{2,5})\b', info)
-                    for port in port_matches:
-                        port_counts[port] = port_counts.get(port, 0) + 1
+            total_packets = state['total_packets']
+            stack_counts = state['stack_counts']
+            port_counts = state['port_counts']
+            ip_counts = state['ip_counts']
+            ip_counts.pop('', None)
+            port_counts.pop('', None)
             
-            cap.close()
+            protocol_counts = defaultdict(int)
+            for protocols, count in stack_counts.items():
+                # frame.protocols lists the stack, e.g. eth:ethertype:ip:tcp:tls
+                proto = protocols.rsplit(':', 1)[-1].upper() if protocols else 'UNKNOWN'
+                protocol_counts[proto] += count
             
-            # Sort by count
-            protocol_counts = dict(sorted(protocol_counts.items(), key=lambda x: x[1], reverse=True))
-            port_counts = dict(sorted(port_counts.items(), key=lambda x: x[1], reverse=True)[:20])
-            ip_counts = dict(sorted(ip_counts.items(), key=lambda x: x[1], reverse=True)[:50])
+            # Sort by count (plain dicts keep the JSON shape)
+            protocol_counts = dict(Counter(protocol_counts).most_common())
+            port_counts = dict(Counter(port_counts).most_common(20))
+            ip_counts = dict(Counter(ip_counts).most_common(50))
             
             self.results = {
                 'success': True,
@@ -103,6 +138,59 @@ class NetworkAnalyzer:
                 'error': f'Failed to parse PCAP file: {str(e)}'
             }
     
+    def _iter_packets(self, file_path: str):
+        """Yield the tshark field values of each packet in the capture"""
+        # Stream typed fields straight from tshark instead of having
+        # pyshark parse PSML summaries packet by packet
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(
+                self._tshark_command(file_path),
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                bufsize=TSHARK_PIPE_BUFFER,
+                text=True,
+                errors='replace'
+            )
+            packets = 0
+            try:
+                with proc.stdout:
+                    for line in proc.stdout:
+                        packets += 1
+                        yield line.rstrip('\n').split('\t')
+            except GeneratorExit:
+                # Caller stopped early; don't leave tshark running
+                proc.kill()
+                raise
+            finally:
+                proc.wait()
+            
+            if proc.returncode != 0 and packets == 0:
+                stderr_file.seek(0)
+                error = stderr_file.read().decode(errors='replace').strip()
+                raise RuntimeError(error or f'tshark exited with status {proc.returncode}')
+    
+    @staticmethod
+    def _accumulate(packets, state: dict) -> int:
+        """Add a chunk of packets to the running counters, returning how many were read"""
+        stack_counts = state['stack_counts']
+        port_counts = state['port_counts']
+        ip_counts = state['ip_counts']
+        count = 0
+        
+        # Keep the per-packet work to plain counter increments: whole
+        # protocol stacks are counted and named once at the end, and
+        # empty fields are counted under '' and dropped at the end
+        for protocols, ip_src, ip_dst, *ports in packets:
+            count += 1
+            stack_counts[protocols] += 1
+            ip_counts[ip_src] += 1
+            ip_counts[ip_dst] += 1
+            for port in ports:
+                port_counts[port] += 1
+        
+        state['total_packets'] += count
+        return count
+    
     async def analyze_pcap_async(self, file_content: bytes, filename: str) -> dict:
         """
         Analyze PCAP content from uploaded file
@@ -114,21 +202,29 @@ class NetworkAnalyzer:
         Returns:
             Dictionary containing analysis results
         """
-        if not PYSHARK_AVAILABLE:
+        if not TSHARK_AVAILABLE:
             return {
                 'success': False,
-                'error': 'pyshark is not installed'
+                'error': 'tshark is not installed'
             }
         
+        memfd = None
         temp_path = None
         try:
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pcap') as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
+            if hasattr(os, 'memfd_create'):
+                # Keep the capture in an anonymous in-memory file; tshark
+                # reopens it through /proc, so nothing is written to disk
+                memfd = os.memfd_create('pcap')
+                self._write_capture(memfd, file_content)
+                capture_path = f'/proc/{os.getpid()}/fd/{memfd}'
+            else:
+                fd, temp_path = tempfile.mkstemp(suffix='.pcap')
+                self._write_capture(fd, file_content)
+                os.close(fd)
+                capture_path = temp_path
             
             # Analyze the file
-            result = self.analyze_pcap(temp_path)
+            result = self.analyze_pcap(capture_path)
             result['filename'] = filename
             
             return result
@@ -139,31 +235,36 @@ class NetworkAnalyzer:
                 'error': f'Failed to process file: {str(e)}'
             }
         finally:
+            if memfd is not None:
+                os.close(memfd)
             # Clean up temp file
             if temp_path and os.path.exists(temp_path):
                 try:
                     os.remove(temp_path)
                 except:
                     pass
+    
+    @staticmethod
+    def _write_capture(fd: int, file_content: bytes):
+        """Write the uploaded capture to fd in large blocks without copying it"""
+        view = memoryview(file_content)
+        with open(fd, 'wb', buffering=UPLOAD_WRITE_BUFFER, closefd=False) as capture:
+            for offset in range(0, len(view), UPLOAD_WRITE_BLOCK):
+                capture.write(view[offset:offset + UPLOAD_WRITE_BLOCK])
 
 
 class TrafficAnalyzer:
     """Provides real-time traffic analysis capabilities"""
     
+    KNOWN_MALICIOUS_PORTS = frozenset({
+        4444,  # Metasploit default
+        5554,  # Sasser worm
+        6666, 6667,  # IRC (often used by botnets)
+        31337,  # Back Orifice
+    })
+    
     def __init__(self):
-        self.suspicious_patterns = [
-            r'(?i)password|passwd|pwd',
-            r'(?i)credit.?card|cc.?num',
-            r'(?i)ssn|social.?security',
-            r'(?i)admin|root|administrator',
-            r'(?i)bearer|token|api.?key',
-        ]
-        self.known_malicious_ports = [
-            4444,  # Metasploit default
-            5554,  # Sasser worm
-            6666, 6667,  # IRC (often used by botnets)
-            31337,  # Back Orifice
-        ]
+        self.known_malicious_ports = self.KNOWN_MALICIOUS_PORTS
     
     def analyze_traffic_patterns(self, ip_counts: dict, port_counts: dict) -> dict:
         """
@@ -196,22 +297,26 @@ class TrafficAnalyzer:
                 continue
         
         # Check for port scanning patterns (many ports with low counts)
-        low_count_ports = [p for p, c in port_counts.items() if c <= 3]
-        if len(low_count_ports) > 20:
+        low_count_ports = sum(1 for c in port_counts.values() if c <= 3)
+        if low_count_ports > 20:
             findings.append({
                 'type': 'warning',
                 'category': 'port_scan',
-                'message': f'Potential port scanning detected ({len(low_count_ports)} ports with low traffic)',
-                'ports_count': len(low_count_ports)
+                'message': f'Potential port scanning detected ({low_count_ports} ports with low traffic)',
+                'ports_count': low_count_ports
             })
             risk_score += 15
         
         # Check for IP patterns (single IP with high traffic)
         if ip_counts:
-            max_ip = max(ip_counts, key=ip_counts.get)
-            total_traffic = sum(ip_counts.values())
+            # Total and busiest IP in a single pass
+            max_ip, max_count, total_traffic = None, -1, 0
+            for ip, count in ip_counts.items():
+                total_traffic += count
+                if count > max_count:
+                    max_ip, max_count = ip, count
             if total_traffic > 0:
-                max_ip_ratio = ip_counts[max_ip] / total_traffic
+                max_ip_ratio = max_count / total_traffic
                 if max_ip_ratio > 0.5:
                     findings.append({
                         'type': 'info',
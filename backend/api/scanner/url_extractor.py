@@ -6,8 +6,12 @@ Includes WHOIS and Domain Intelligence features
 Originally from SubVeil - Integrated into FortifAI Security Platform
 """
 
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qsl
+from collections import OrderedDict
+import asyncio
 import socket
+import threading
+import time
 import re
 from datetime import datetime, timezone
 
@@ -17,6 +21,58 @@ try:
 except ImportError:
     WHOIS_AVAILABLE = False
 
+# Maximum URLs resolved at once by extract_many
+BATCH_CONCURRENCY = 32
+
+# Longer inputs are rejected before any regex work is done
+MAX_URL_LENGTH = 8192
+
+# Schemes accepted by _URL_RE, checked up front with str.startswith
+_URL_SCHEMES = ('http://', 'https://', 'ftp://')
+
+# Compiled once; fullmatch anchors both ends (a trailing newline is rejected)
+_URL_RE = re.compile(
+    r'(?:https?|ftp)://'  # protocol
+    r'[a-zA-Z0-9.-]+'     # domain
+    r'(?::[0-9]+)?'       # optional port
+    r'(?:/.*)?'           # path
+)
+
+
+class _TTLCache:
+    """Small thread-safe cache whose entries expire after a fixed TTL"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+    
+    def set(self, key, value):
+        """Store a value, evicting the oldest entries beyond maxsize"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Process-wide lookup caches shared by every URLExtractor
+_DNS_CACHE = _TTLCache(maxsize=10000, ttl=300)
+_WHOIS_CACHE = _TTLCache(maxsize=5000, ttl=3600)
+
 
 class URLExtractor:
     """Class to extract comprehensive information from URLs"""
@@ -28,13 +84,28 @@ class URLExtractor:
         
     def validate_url(self) -> bool:
         """Validate URL format"""
-        url_pattern = re.compile(
-            r'^(https?|ftp)://'  # protocol
-            r'([a-zA-Z0-9.-]+)'   # domain
-            r'(:[0-9]+)?'         # optional port
-            r'(/.*)?$'            # path
-        )
-        return bool(url_pattern.match(self.url))
+        return self.is_valid_url(self.url)
+    
+    @classmethod
+    def is_valid_url(cls, url: str) -> bool:
+        """Validate a URL string without building an extractor"""
+        # Cheap prefix check rejects most bad input before the regex runs
+        if len(url) > MAX_URL_LENGTH or not url.startswith(_URL_SCHEMES):
+            return False
+        return bool(_URL_RE.fullmatch(url))
+    
+    @classmethod
+    async def extract_many(cls, urls: list) -> list:
+        """Extract information from several URLs concurrently, preserving order"""
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def extract(url: str):
+            # DNS and WHOIS lookups block, so each URL runs in a worker
+            # thread; the shared lookup caches dedupe repeated domains
+            async with semaphore:
+                return await asyncio.to_thread(cls(url).extract_all_info)
+        
+        return await asyncio.gather(*(extract(url) for url in urls))
     
     def extract_all_info(self) -> dict | None:
         """Extract all information from the URL"""
@@ -87,8 +158,13 @@ class URLExtractor:
         if not self.parsed.query:
             return 'None'
         
-        params = parse_qs(self.parsed.query)
-        param_list = [f"{k}={v[0]}" for k, v in params.items()]
+        # First value per key, in order, without building parse_qs' dict of lists
+        seen = set()
+        param_list = []
+        for key, value in parse_qsl(self.parsed.query):
+            if key not in seen:
+                seen.add(key)
+                param_list.append(f"{key}={value}")
         return ', '.join(param_list)
     
     def _extract_subdomain_tld(self) -> tuple:
@@ -133,7 +209,11 @@ class URLExtractor:
         try:
             hostname = self.parsed.hostname
             if hostname:
-                ip = socket.gethostbyname(hostname)
+                ip = _DNS_CACHE.get(hostname)
+                if ip is None:
+                    addresses = socket.getaddrinfo(hostname, None, socket.AF_INET, socket.SOCK_STREAM)
+                    ip = addresses[0][4][0]
+                    _DNS_CACHE.set(hostname, ip)
                 return ip
             return 'Unable to resolve'
         except socket.gaierror:
@@ -151,7 +231,7 @@ class URLExtractor:
             if not hostname:
                 return self._empty_whois_data()
             
-            domain_info = whois.whois(hostname)
+            domain_info = self._lookup_whois(hostname)
             
             registrar = self._safe_extract(domain_info.registrar)
             organization = self._safe_extract(domain_info.org)
@@ -159,13 +239,16 @@ class URLExtractor:
             expiry_date = self._safe_extract_date(domain_info.expiration_date)
             updated_date = self._safe_extract_date(domain_info.updated_date)
             
-            domain_age_info = self._calculate_domain_age(creation_date)
+            # One reference time for both the age and the expiry checks
+            now = datetime.now()
+            domain_age_info = self._calculate_domain_age(creation_date, now)
             
             trust_score, risk_level = self._calculate_trust_score(
                 domain_age_info['age_days'],
                 registrar,
                 organization,
-                expiry_date
+                expiry_date,
+                now
             )
             
             return {
@@ -185,6 +268,19 @@ class URLExtractor:
         except Exception:
             return self._empty_whois_data()
     
+    def _lookup_whois(self, hostname: str):
+        """Query WHOIS, sharing cached results between subdomains of a domain"""
+        try:
+            domain = whois.extract_domain(hostname)
+        except Exception:
+            domain = hostname
+        
+        domain_info = _WHOIS_CACHE.get(domain)
+        if domain_info is None:
+            domain_info = whois.whois(domain)
+            _WHOIS_CACHE.set(domain, domain_info)
+        return domain_info
+    
     def _safe_extract(self, value) -> str:
         """Safely extract string value from WHOIS data"""
         if value is None:
@@ -218,14 +314,13 @@ class URLExtractor:
             return [str(item) for item in value[:3]]
         return [str(value)]
     
-    def _calculate_domain_age(self, creation_date: str) -> dict:
+    def _calculate_domain_age(self, creation_date: str, now: datetime) -> dict:
         """Calculate domain age from creation date"""
         if creation_date == 'Not Available':
             return {'age_text': 'Unknown', 'age_days': 0}
         
         try:
-            date_obj = datetime.strptime(creation_date, '%Y-%m-%d')
-            now = datetime.now()
+            date_obj = datetime.fromisoformat(creation_date)
             age_delta = now - date_obj
             age_days = age_delta.days
             
@@ -246,7 +341,7 @@ class URLExtractor:
             return {'age_text': 'Unknown', 'age_days': 0}
     
     def _calculate_trust_score(self, age_days: int, registrar: str, 
-                               organization: str, expiry_date: str) -> tuple:
+                               organization: str, expiry_date: str, now: datetime) -> tuple:
         """Calculate domain trust score and risk level"""
         score = 0
         
@@ -282,8 +377,8 @@ class URLExtractor:
         # Expiry date scoring (max 15 points)
         if expiry_date != 'Not Available':
             try:
-                expiry_obj = datetime.strptime(expiry_date, '%Y-%m-%d')
-                days_until_expiry = (expiry_obj - datetime.now()).days
+                expiry_obj = datetime.fromisoformat(expiry_date)
+                days_until_expiry = (expiry_obj - now).days
                 
                 if days_until_expiry > 365:
                     score += 15
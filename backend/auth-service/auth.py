@@ -1,11 +1,16 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import FrozenSet, Optional
+import hashlib
+import jwt
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,19 +20,38 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+# bcrypt work factor; lower it (e.g. 4) for local development and tests
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Decoded token cache (LRU, entries live at most TOKEN_CACHE_TTL_SECONDS)
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_SIZE = 4096
+
+# bcrypt over a SHA-256 digest avoids bcrypt's 72-byte truncation; plain
+# bcrypt hashes still verify
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    bcrypt_sha256__rounds=BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Verified against when the user doesn't exist, so a failed login costs
+# the same bcrypt work whether or not the username is known
+_DUMMY_HASH = pwd_context.hash("not-a-real-password")
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str
 
 class TokenData(BaseModel):
+    # Cached instances are shared between requests, so they must not be mutated
+    model_config = ConfigDict(frozen=True)
+    
     username: Optional[str] = None
     role: Optional[str] = None
-    permissions: list = []
+    permissions: FrozenSet[str] = frozenset()
 
 class User(BaseModel):
     username: str
@@ -44,15 +68,20 @@ class AuthService:
     Authentication and Authorization service with RBAC
     """
     
+    _mock_users: Optional[dict] = None
+    _mock_users_lock = threading.Lock()
+    _token_cache = OrderedDict()
+    _token_cache_lock = threading.Lock()
+    
     def __init__(self, db_connection=None):
         self.db = db_connection
         
         # Role-based permissions
         self.role_permissions = {
-            'admin': ['read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'],
-            'analyst': ['read', 'write', 'view_logs', 'manage_alerts'],
-            'viewer': ['read', 'view_logs'],
-            'api': ['read', 'write']
+            'admin': frozenset({'read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'}),
+            'analyst': frozenset({'read', 'write', 'view_logs', 'manage_alerts'}),
+            'viewer': frozenset({'read', 'view_logs'}),
+            'api': frozenset({'read', 'write'})
         }
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
@@ -89,55 +118,80 @@ class AuthService:
     
     def decode_token(self, token: str) -> Optional[TokenData]:
         """Decode and validate JWT token"""
+        # Hot bearer tokens are served from a short-lived cache keyed by a
+        # digest of the token, skipping the signature verification
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        with self._token_cache_lock:
+            cached = self._token_cache.get(cache_key)
+            if cached is not None:
+                expires_at, token_data = cached
+                if expires_at > now:
+                    self._token_cache.move_to_end(cache_key)
+                    return token_data
+                del self._token_cache[cache_key]
+        
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = jwt.decode(
+                token, SECRET_KEY, algorithms=[ALGORITHM],
+                options={"require": ["exp", "sub"]}
+            )
             username: str = payload.get("sub")
             role: str = payload.get("role")
             
             if username is None:
                 return None
             
-            permissions = self.role_permissions.get(role, [])
-            
-            return TokenData(username=username, role=role, permissions=permissions)
+            permissions = self.role_permissions.get(role, frozenset())
+            token_data = TokenData(username=username, role=role, permissions=permissions)
         
         except JWTError:
             return None
+        
+        # Never serve a cached entry past the token's own expiry
+        expires_at = min(now + TOKEN_CACHE_TTL_SECONDS, payload["exp"])
+        with self._token_cache_lock:
+            self._token_cache[cache_key] = (expires_at, token_data)
+            while len(self._token_cache) > TOKEN_CACHE_MAX_SIZE:
+                self._token_cache.popitem(last=False)
+        return token_data
     
     def authenticate_user(self, username: str, password: str) -> Optional[UserInDB]:
         """Authenticate user with username and password"""
         # In production, fetch from database
         user = self._get_user_from_db(username)
+        candidate_hash = user.hashed_password if user else _DUMMY_HASH
         
-        if not user:
-            return None
-        
-        if not self.verify_password(password, user.hashed_password):
+        if not self.verify_password(password, candidate_hash) or not user:
             return None
         
         return user
     
     def _get_user_from_db(self, username: str) -> Optional[UserInDB]:
         """Get user from database (mock implementation)"""
-        # Mock users - replace with actual database query
-        mock_users = {
-            "admin": UserInDB(
-                username="admin",
-                email="admin@fortifai.com",
-                full_name="System Administrator",
-                role="admin",
-                hashed_password=self.get_password_hash("admin123")
-            ),
-            "analyst": UserInDB(
-                username="analyst",
-                email="analyst@fortifai.com",
-                full_name="Security Analyst",
-                role="analyst",
-                hashed_password=self.get_password_hash("analyst123")
-            )
-        }
+        # Mock users - replace with actual database query. Hashed once per
+        # process since bcrypt is far too slow to rerun on every login
+        if AuthService._mock_users is None:
+            with AuthService._mock_users_lock:
+                if AuthService._mock_users is None:
+                    AuthService._mock_users = {
+                        "admin": UserInDB(
+                            username="admin",
+                            email="admin@fortifai.com",
+                            full_name="System Administrator",
+                            role="admin",
+                            hashed_password=self.get_password_hash("admin123")
+                        ),
+                        "analyst": UserInDB(
+                            username="analyst",
+                            email="analyst@fortifai.com",
+                            full_name="Security Analyst",
+                            role="analyst",
+                            hashed_password=self.get_password_hash("analyst123")
+                        )
+                    }
         
-        return mock_users.get(username)
+        return AuthService._mock_users.get(username)
     
     def check_permission(self, token_data: TokenData, required_permission: str) -> bool:
         """Check if user has required permission"""
@@ -177,10 +231,13 @@ class AuthService:
         return new_access_token
 
 
+# Shared by every request; the service holds no per-request state
+auth_service = AuthService()
+
+
 # Dependency for protected routes
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
     """Dependency to get current authenticated user"""
-    auth_service = AuthService()
     token_data = auth_service.decode_token(token)
     
     if token_data is None:
@@ -195,8 +252,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
 def require_permission(permission: str):
     """Decorator to require specific permission"""
     async def permission_checker(current_user: TokenData = Depends(get_current_user)):
-        auth_service = AuthService()
-        
         if not auth_service.check_permission(current_user, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
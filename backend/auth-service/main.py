@@ -2,28 +2,57 @@
 FortifAI Authentication Service
 Enhanced version with API endpoints
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List
-from jose import JWTError, jwt
+from typing import FrozenSet, Optional
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+import jwt
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import os
 from dotenv import load_dotenv
 import uvicorn
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+# bcrypt work factor; lower it (e.g. 4) for local development and tests
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt over a SHA-256 digest avoids bcrypt's 72-byte truncation; plain
+# bcrypt hashes still verify
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    bcrypt_sha256__rounds=BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Verified against when the user doesn't exist, so a failed login costs
+# the same bcrypt work whether or not the username is known
+_DUMMY_HASH = pwd_context.hash("not-a-real-password")
+
 # Pydantic Models
 class Token(BaseModel):
     access_token: str
@@ -31,9 +60,12 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
+    # Instances are shared between requests, so they must not be mutated
+    model_config = ConfigDict(frozen=True)
+    
     username: Optional[str] = None
     role: Optional[str] = None
-    permissions: List[str] = []
+    permissions: FrozenSet[str] = frozenset()
 
 class UserCreate(BaseModel):
     username: str
@@ -52,15 +84,38 @@ class UserResponse(BaseModel):
 class UserInDB(UserResponse):
     hashed_password: str
 
+# Users live in a Redis hash shared by every worker when REDIS_URL is set;
+# otherwise fall back to a per-process in-memory store
+REDIS_URL = os.getenv("REDIS_URL")
+USERS_KEY = "users"
+_redis_client = redis.from_url(REDIS_URL) if REDIS_AVAILABLE and REDIS_URL else None
+
 # In-memory user store (replace with database in production)
 fake_users_db = {}
+_fake_users_db_lock = threading.Lock()
+
+# Per-worker cache of recently seen users in front of the shared store
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_SIZE = 1024
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+# Decoded token cache (LRU, entries live at most TOKEN_CACHE_TTL_SECONDS)
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_SIZE = 50_000
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+# TokenData interned per (username, role); every token for the same
+# identity decodes to the same instance
+_token_data_cache = weakref.WeakValueDictionary()
 
 # Role permissions
 ROLE_PERMISSIONS = {
-    'admin': ['read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'],
-    'analyst': ['read', 'write', 'view_logs', 'manage_alerts'],
-    'viewer': ['read', 'view_logs'],
-    'api': ['read', 'write']
+    'admin': frozenset({'read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'}),
+    'analyst': frozenset({'read', 'write', 'view_logs', 'manage_alerts'}),
+    'viewer': frozenset({'read', 'view_logs'}),
+    'api': frozenset({'read', 'write'})
 }
 
 class AuthService:
@@ -90,28 +145,88 @@ class AuthService:
     
     @staticmethod
     def decode_token(token: str) -> Optional[TokenData]:
+        # Hot bearer tokens are served from a short-lived cache keyed by a
+        # digest of the token, skipping the signature verification
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        with _token_cache_lock:
+            cached = _token_cache.get(cache_key)
+            if cached is not None:
+                expires_at, token_data = cached
+                if expires_at > now:
+                    _token_cache.move_to_end(cache_key)
+                    return token_data
+                del _token_cache[cache_key]
+        
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = jwt.decode(
+                token, SECRET_KEY, algorithms=[ALGORITHM],
+                options={"require": ["exp", "sub"]}
+            )
             username = payload.get("sub")
             role = payload.get("role")
             
             if username is None:
                 return None
             
-            permissions = ROLE_PERMISSIONS.get(role, [])
-            return TokenData(username=username, role=role, permissions=permissions)
+            token_data = AuthService._intern_token_data(username, role)
         except JWTError:
             return None
+        
+        # Never serve a cached entry past the token's own expiry
+        expires_at = min(now + TOKEN_CACHE_TTL_SECONDS, payload["exp"])
+        with _token_cache_lock:
+            _token_cache[cache_key] = (expires_at, token_data)
+            while len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+                _token_cache.popitem(last=False)
+        return token_data
+    
+    @staticmethod
+    def _intern_token_data(username: str, role: Optional[str]) -> TokenData:
+        key = (username, role)
+        with _token_cache_lock:
+            token_data = _token_data_cache.get(key)
+            if token_data is None:
+                token_data = TokenData(
+                    username=username,
+                    role=role,
+                    permissions=ROLE_PERMISSIONS.get(role, frozenset())
+                )
+                _token_data_cache[key] = token_data
+        return token_data
     
     @staticmethod
     def get_user(username: str) -> Optional[UserInDB]:
-        if username in fake_users_db:
-            user_data = fake_users_db[username]
-            return UserInDB(**user_data)
-        return None
+        now = time.time()
+        with _user_cache_lock:
+            cached = _user_cache.get(username)
+            if cached is not None:
+                expires_at, user = cached
+                if expires_at > now:
+                    _user_cache.move_to_end(username)
+                    return user
+                del _user_cache[username]
+        
+        if _redis_client is not None:
+            raw = _redis_client.hget(USERS_KEY, username)
+            user = UserInDB.model_validate_json(raw) if raw else None
+        elif username in fake_users_db:
+            user = UserInDB(**fake_users_db[username])
+        else:
+            user = None
+        
+        # Misses are not cached so a user registered on another worker is
+        # visible immediately
+        if user is not None:
+            with _user_cache_lock:
+                _user_cache[username] = (now + USER_CACHE_TTL_SECONDS, user)
+                while len(_user_cache) > USER_CACHE_MAX_SIZE:
+                    _user_cache.popitem(last=False)
+        return user
     
     @staticmethod
-    def create_user(user_data: UserCreate) -> UserInDB:
+    def create_user(user_data: UserCreate) -> Optional[UserInDB]:
+        """Create a user, or return None if the username is already taken"""
         hashed_password = AuthService.get_password_hash(user_data.password)
         user = {
             "username": user_data.username,
@@ -121,15 +236,31 @@ class AuthService:
             "disabled": False,
             "hashed_password": hashed_password
         }
-        fake_users_db[user_data.username] = user
-        return UserInDB(**user)
+        user = UserInDB(**user)
+        # Check and insert in one step so concurrent registrations of a
+        # name, on this worker or another, can't overwrite each other
+        if _redis_client is not None:
+            if not _redis_client.hsetnx(USERS_KEY, user.username, user.model_dump_json()):
+                return None
+        else:
+            with _fake_users_db_lock:
+                if user.username in fake_users_db:
+                    return None
+                fake_users_db[user.username] = user.model_dump()
+        return user
+    
+    @staticmethod
+    def register_user(user_data: UserCreate) -> Optional[UserInDB]:
+        """Create a user unless the username is taken, checking first to skip the hashing"""
+        if AuthService.get_user(user_data.username) is not None:
+            return None
+        return AuthService.create_user(user_data)
     
     @staticmethod
     def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
         user = AuthService.get_user(username)
-        if not user:
-            return None
-        if not AuthService.verify_password(password, user.hashed_password):
+        candidate_hash = user.hashed_password if user else _DUMMY_HASH
+        if not AuthService.verify_password(password, candidate_hash) or not user:
             return None
         return user
 
@@ -155,12 +286,13 @@ async def health():
 
 @app.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate):
-    if user_data.username in fake_users_db:
+    # bcrypt and the Redis round trips block; keep them off the event loop
+    user = await asyncio.to_thread(auth_service.register_user, user_data)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
-    user = auth_service.create_user(user_data)
     return UserResponse(
         username=user.username,
         email=user.email,
@@ -171,7 +303,9 @@ async def register(user_data: UserCreate):
 
 @app.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    user = await asyncio.to_thread(
+        auth_service.authenticate_user, form_data.username, form_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -211,21 +345,33 @@ async def verify_token(current_user: TokenData = Depends(get_current_user)):
         "valid": True,
         "username": current_user.username,
         "role": current_user.role,
-        "permissions": current_user.permissions
+        "permissions": sorted(current_user.permissions)
     }
 
 # Create default admin user on startup
 @app.on_event("startup")
 async def create_default_admin():
-    if "admin" not in fake_users_db:
-        auth_service.create_user(UserCreate(
+    if auth_service.get_user("admin") is None:
+        created = auth_service.create_user(UserCreate(
             username="admin",
             email="admin@fortifai.io",
             password="admin123",  # Change in production!
             full_name="System Administrator",
             role="admin"
         ))
-        print("Default admin user created")
+        # None means another worker created it between the check and here
+        if created is not None:
+            logger.info("Default admin user created")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=5002)
+    # Workers only share users through Redis, so without it stay on one
+    # process. loop/http "auto" pick uvloop and httptools when installed
+    default_workers = (os.cpu_count() or 1) if _redis_client is not None else 1
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=5002,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", default_workers))
+    )
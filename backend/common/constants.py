@@ -40,39 +40,41 @@ ROLE_VIEWER = "viewer"
 ROLE_API = "api"
 
 ROLE_PERMISSIONS = {
-    ROLE_ADMIN: ['read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'],
-    ROLE_ANALYST: ['read', 'write', 'view_logs', 'manage_alerts'],
-    ROLE_VIEWER: ['read', 'view_logs'],
-    ROLE_API: ['read', 'write']
+    ROLE_ADMIN: frozenset({'read', 'write', 'delete', 'manage_users', 'view_logs', 'manage_alerts', 'configure_system'}),
+    ROLE_ANALYST: frozenset({'read', 'write', 'view_logs', 'manage_alerts'}),
+    ROLE_VIEWER: frozenset({'read', 'view_logs'}),
+    ROLE_API: frozenset({'read', 'write'})
 }
 
-# Suspicious Process Patterns
-SUSPICIOUS_PROCESSES = [
+# Suspicious Process Names (exact-name membership checks). Command-line
+# fragments such as 'powershell -enc' and 'reg add' span arguments and can't
+# match a process name; ProcessCollector matches its patterns against the
+# full command line instead
+SUSPICIOUS_PROCESSES = frozenset({
     'mimikatz', 'psexec', 'procdump', 'netcat', 'nc',
-    'powershell -enc', 'certutil', 'bitsadmin',
-    'wmic', 'reg add', 'schtasks'
-]
+    'certutil', 'bitsadmin', 'wmic', 'schtasks'
+})
 
 # System Processes (Windows)
-SYSTEM_PROCESSES_WINDOWS = [
+SYSTEM_PROCESSES_WINDOWS = frozenset({
     'svchost.exe', 'explorer.exe', 'csrss.exe', 'wininit.exe',
     'services.exe', 'lsass.exe', 'winlogon.exe', 'smss.exe'
-]
+})
 
 # System Processes (Linux)
-SYSTEM_PROCESSES_LINUX = [
+SYSTEM_PROCESSES_LINUX = frozenset({
     'systemd', 'init', 'kthreadd', 'kworker', 'migration',
     'rcu_sched', 'watchdog', 'ksoftirqd'
-]
+})
 
 # Network Ports of Interest
-SUSPICIOUS_PORTS = [
+SUSPICIOUS_PORTS = frozenset({
     4444,   # Metasploit default
     5555,   # Android debug
     6666,   # IRC
     31337,  # Back Orifice
     12345,  # NetBus
-]
+})
 
 # Event Types
 EVENT_LOGIN = "login"
@@ -4,10 +4,26 @@ Structured Logger for FortifAI
 import structlog
 import logging
 import sys
-from datetime import datetime
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize a log event with orjson (stdlib logging needs str)"""
+    return orjson.dumps(obj, **kwargs).decode()
+
+# Set once setup_logging has run; get_logger only configures on first use
+_logging_configured = False
 
 def setup_logging(log_level: str = "INFO"):
     """Setup structured logging"""
+    global _logging_configured
+    
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
@@ -18,7 +34,8 @@ def setup_logging(log_level: str = "INFO"):
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps) if ORJSON_AVAILABLE
+            else structlog.processors.JSONRenderer()
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -31,10 +48,12 @@ def setup_logging(log_level: str = "INFO"):
         stream=sys.stdout,
         level=getattr(logging, log_level.upper())
     )
+    _logging_configured = True
 
 def get_logger(name: str):
     """Get a structured logger instance"""
-    setup_logging()
+    if not _logging_configured:
+        setup_logging()
     return structlog.get_logger(name)
 
 class SecurityLogger:
@@ -51,8 +70,7 @@ class SecurityLogger:
             event_type=event_type,
             service=self.service,
             severity=severity,
-            details=details,
-            timestamp=datetime.now().isoformat()
+            details=details
         )
     
     def log_authentication(self, user: str, success: bool, ip_address: str = None):
@@ -61,8 +79,7 @@ class SecurityLogger:
             "authentication",
             user=user,
             success=success,
-            ip_address=ip_address,
-            timestamp=datetime.now().isoformat()
+            ip_address=ip_address
         )
     
     def log_threat_detection(self, threat_type: str, confidence: float, details: dict):
@@ -71,6 +88,5 @@ class SecurityLogger:
             "threat_detected",
             threat_type=threat_type,
             confidence=confidence,
-            details=details,
-            timestamp=datetime.now().isoformat()
+            details=details
         )
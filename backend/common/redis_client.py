@@ -3,20 +3,68 @@ Redis Client for caching and pub/sub
 """
 import redis
 import json
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 import os
+import threading
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# orjson when installed (bytes out, which redis accepts as-is), stdlib json otherwise
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _json_dumps(value: Any):
+    """Serialize value to JSON"""
+    if ORJSON_AVAILABLE:
+        # OPT_NON_STR_KEYS keeps int/enum keys working as they did with json;
+        # anything orjson still refuses goes through the stdlib below
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+
+# Connection pool limits, shared by every RedisClient for the same URL
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONN", "64"))
+REDIS_POOL_TIMEOUT = 5  # seconds to wait for a free connection
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(url: str) -> redis.BlockingConnectionPool:
+    """Return the process-wide connection pool for url"""
+    # redis-py resets a pool's connections itself after a fork
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                url,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT,
+                decode_responses=True,
+                socket_keepalive=True
+            )
+            _pools[url] = pool
+        return pool
+
 
 class RedisClient:
     """Redis client wrapper for FortifAI"""
     
     def __init__(self, url: str = None):
         self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379")
-        self._client = None
+        # Connections are opened lazily by the pool
+        self._client = redis.Redis(connection_pool=_get_pool(self.url))
     
     @property
     def client(self):
-        if self._client is None:
-            self._client = redis.from_url(self.url, decode_responses=True)
         return self._client
     
     def get(self, key: str) -> Optional[Any]:
@@ -24,7 +72,7 @@ class RedisClient:
         value = self.client.get(key)
         if value:
             try:
-                return json.loads(value)
+                return _json_loads(value)
             except json.JSONDecodeError:
                 return value
         return None
@@ -32,16 +80,30 @@ class RedisClient:
     def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """Set value in cache with expiration"""
         if isinstance(value, (dict, list)):
-            value = json.dumps(value)
+            value = _json_dumps(value)
         return self.client.setex(key, expire, value)
     
+    def set_many(self, items: Dict[str, Any], expire: int = 3600, pipe=None):
+        """Set several values with the same expiration in a single round trip, or queue them on pipe"""
+        queue = pipe if pipe is not None else self.pipeline()
+        for key, value in items.items():
+            if isinstance(value, (dict, list)):
+                value = _json_dumps(value)
+            queue.setex(key, expire, value)
+        if pipe is None:
+            queue.execute()
+    
+    def pipeline(self, transaction: bool = False):
+        """Get a pipeline that sends queued commands in one round trip"""
+        return self.client.pipeline(transaction=transaction)
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         return bool(self.client.delete(key))
     
-    def publish(self, channel: str, message: dict):
-        """Publish message to channel"""
-        self.client.publish(channel, json.dumps(message))
+    def publish(self, channel: str, message: dict, pipe=None):
+        """Publish message to channel, or queue it on a pipeline"""
+        (pipe if pipe is not None else self.client).publish(channel, _json_dumps(message))
     
     def subscribe(self, channel: str):
         """Subscribe to channel"""
@@ -57,6 +119,26 @@ class RedisClient:
         """Cache alert data"""
         self.set(f"alert:{alert_id}", alert_data, expire)
     
+    def cache_and_publish_alert(self, alert_id: str, alert_data: dict,
+                                channel: str = "alerts:new", expire: int = 86400):
+        """Cache an alert and publish it in a single round trip"""
+        payload = _json_dumps(alert_data)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.setex(f"alert:{alert_id}", expire, payload)
+        pipe.publish(channel, payload)
+        pipe.execute()
+    
+    def cache_and_publish_alerts(self, alerts: List[dict], channel: str = "alerts:new",
+                                 expire: int = 86400, pipe=None):
+        """Cache and publish several alerts, keyed by their "id", in a single round trip"""
+        queue = pipe if pipe is not None else self.pipeline()
+        for alert_data in alerts:
+            payload = _json_dumps(alert_data)
+            queue.setex(f"alert:{alert_data['id']}", expire, payload)
+            queue.publish(channel, payload)
+        if pipe is None:
+            queue.execute()
+    
     def get_cached_threat(self, threat_id: str) -> Optional[dict]:
         """Get cached threat"""
         return self.get(f"threat:{threat_id}")
@@ -74,7 +156,10 @@ class RedisClient:
     def check_rate_limit(self, identifier: str, limit: int = 100, window: int = 60) -> bool:
         """Check if rate limit exceeded"""
         key = f"ratelimit:{identifier}"
-        current = self.client.incr(key)
-        if current == 1:
-            self.client.expire(key, window)
+        # Start the window (SET NX only applies to a new key) and count the
+        # request in one atomic round trip; INCR keeps the key's TTL
+        pipe = self.client.pipeline()
+        pipe.set(key, 0, ex=window, nx=True)
+        pipe.incr(key)
+        _, current = pipe.execute()
         return current <= limit
@@ -1,59 +1,75 @@
 """
 Common Utility Functions
 """
-import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 import hashlib
 import re
+import secrets
+import time
+
+# Patterns compiled once at import
+_SANITIZE_RE = re.compile(r'[<>"\']')
+_IP_RE = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+_VALID_IP_RE = re.compile(
+    r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
+)
+
+# format_bytes units, each 1024x the previous
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 def generate_id(prefix: str = "") -> str:
     """Generate unique ID with optional prefix"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    unique = uuid.uuid4().hex[:8]
+    # Milliseconds since the epoch keep IDs sortable by creation time
+    timestamp = time.time_ns() // 1_000_000
+    unique = secrets.token_hex(4)
     if prefix:
         return f"{prefix}-{timestamp}-{unique}"
     return f"{timestamp}-{unique}"
 
 def parse_timestamp(timestamp: str) -> Optional[datetime]:
     """Parse timestamp string to datetime"""
-    formats = [
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d"
-    ]
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(timestamp, fmt)
-        except ValueError:
-            continue
-    return None
+    # fromisoformat covers every supported layout in one C-level call; a
+    # trailing Z is dropped so UTC stamps stay naive as before
+    if timestamp.endswith('Z'):
+        timestamp = timestamp[:-1]
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    # Stamps with a UTC offset come back as naive UTC too, so every result
+    # compares with every other
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 def hash_string(text: str, algorithm: str = "sha256") -> str:
     """Hash a string using specified algorithm"""
-    hasher = hashlib.new(algorithm)
-    hasher.update(text.encode('utf-8'))
-    return hasher.hexdigest()
+    if algorithm == "sha256":
+        return hash_crypto(text)
+    return hashlib.new(algorithm, text.encode('utf-8')).hexdigest()
+
+def hash_crypto(text: str) -> str:
+    """SHA-256 hex digest, for anything security-relevant"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def hash_fast(text: str) -> str:
+    """Short BLAKE2b hex digest, for IDs and cache keys"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
 
 def sanitize_input(text: str) -> str:
     """Sanitize user input"""
     # Remove potentially dangerous characters
-    sanitized = re.sub(r'[<>"\']', '', text)
+    sanitized = _SANITIZE_RE.sub('', text)
     return sanitized.strip()
 
 def extract_ip_addresses(text: str) -> list:
     """Extract IP addresses from text"""
-    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-    return re.findall(ip_pattern, text)
+    return _IP_RE.findall(text)
 
 def is_valid_ip(ip: str) -> bool:
     """Validate IP address format"""
-    pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
-    return bool(re.match(pattern, ip))
+    return bool(_VALID_IP_RE.match(ip))
 
 def calculate_risk_score(factors: dict) -> float:
     """Calculate risk score based on various factors"""
@@ -74,8 +90,8 @@ def calculate_risk_score(factors: dict) -> float:
 
 def format_bytes(size: int) -> str:
     """Format bytes to human readable string"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size < 1024:
-            return f"{size:.2f} {unit}"
-        size /= 1024
-    return f"{size:.2f} PB"
+    if size < 1024:
+        return f"{size:.2f} B"
+    # Each unit is 2**10 larger, so the bit length picks the unit directly
+    index = min((int(size).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{size / (1 << (index * 10)):.2f} {_BYTE_UNITS[index]}"
@@ -4,10 +4,88 @@ Collects system event logs (Windows Event Log / Linux syslog)
 """
 import os
 import platform
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List
+from xml.etree import ElementTree
 import re
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+# Syslog line: timestamp, hostname, service[pid]: message
+_SYSLOG_RE = re.compile(r'^(\w{3}\s+\d+\s+\d{2}:\d{2}:\d{2})\s+(\S+)\s+(\S+?)(?:\[\d+\])?:\s*(.+)$')
+
+# Messages worth flagging (matched case-insensitively)
+SUSPICIOUS_LOG_PATTERNS = (
+    r'failed password',
+    r'authentication failure',
+    r'invalid user',
+    r'connection refused',
+    r'permission denied',
+    r'segfault',
+    r'buffer overflow',
+    r'root login',
+    r'sudo:.*COMMAND',
+    r'POSSIBLE BREAK-IN',
+)
+
+# All patterns folded into one alternation so each message is scanned once
+_SUSPICIOUS_RE = re.compile('|'.join(SUSPICIOUS_LOG_PATTERNS), re.IGNORECASE)
+
+# With hyperscan installed the patterns are compiled into a single DFA
+# database; otherwise _SUSPICIOUS_RE is used
+_SUSPICIOUS_DB = None
+if HYPERSCAN_AVAILABLE:
+    _SUSPICIOUS_DB = hyperscan.Database()
+    _SUSPICIOUS_DB.compile(
+        expressions=[pattern.encode() for pattern in SUSPICIOUS_LOG_PATTERNS],
+        ids=list(range(len(SUSPICIOUS_LOG_PATTERNS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(SUSPICIOUS_LOG_PATTERNS)
+    )
+
+
+# Windows events fetched per EvtNext call, and the namespace of their XML
+EVT_BATCH_SIZE = 100
+_EVT_NS = '{http://schemas.microsoft.com/win/2004/08/events/event}'
+
+# Block size used when reading log files backwards from the end
+TAIL_CHUNK_SIZE = 8192
+
+
+def _tail_lines(path: str, count: int) -> List[str]:
+    """Return the last count lines of a file, reading only its tail"""
+    chunks = []
+    newlines = 0
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        # One extra newline is needed so the first kept line is complete
+        while position > 0 and newlines <= count:
+            step = min(TAIL_CHUNK_SIZE, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newlines += chunk.count(b'\n')
+            chunks.append(chunk)
+    
+    data = b''.join(reversed(chunks))
+    return data.decode('utf-8', 'replace').splitlines()[-count:]
+
+
+def _stop_on_match(*args) -> bool:
+    """Hyperscan match handler that ends the scan at the first hit"""
+    return True
+
 class EventLogCollector:
     """Collects system event logs"""
     
@@ -46,42 +124,30 @@ class EventLogCollector:
         
         try:
             import win32evtlog
-            import win32evtlogutil
             
             logs = ['Security', 'System', 'Application']
             
+            # Let the event log service do the time filtering through an
+            # XPath query instead of reading every record back into Python
+            since = self.last_collection.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+            query = f"*[System[TimeCreated[@SystemTime>'{since}Z']]]"
+            publishers = {}
+            
             for log_type in logs:
                 try:
-                    hand = win32evtlog.OpenEventLog(None, log_type)
-                    flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+                    handle = win32evtlog.EvtQuery(
+                        log_type,
+                        win32evtlog.EvtQueryChannelPath | win32evtlog.EvtQueryReverseDirection,
+                        query
+                    )
                     
                     while True:
-                        events_batch = win32evtlog.ReadEventLog(hand, flags, 0)
+                        events_batch = win32evtlog.EvtNext(handle, EVT_BATCH_SIZE)
                         if not events_batch:
                             break
                         
                         for event in events_batch:
-                            event_time = event.TimeGenerated
-                            
-                            if event_time < self.last_collection:
-                                break
-                            
-                            event_data = {
-                                "event_type": "windows_event",
-                                "timestamp": event_time.isoformat(),
-                                "event_id": event.EventID & 0xFFFF,
-                                "source": event.SourceName,
-                                "log_type": log_type,
-                                "category": event.EventCategory,
-                                "computer": event.ComputerName,
-                                "message": win32evtlogutil.SafeFormatMessage(event, log_type),
-                                "is_security_event": (event.EventID & 0xFFFF) in self.security_events,
-                                "collector_source": "event_collector"
-                            }
-                            
-                            events.append(event_data)
-                    
-                    win32evtlog.CloseEventLog(hand)
+                            events.append(self._render_windows_event(event, log_type, publishers))
                     
                 except Exception as e:
                     print(f"Error reading {log_type} log: {e}")
@@ -93,6 +159,44 @@ class EventLogCollector:
         self.last_collection = datetime.now()
         return events
     
+    def _render_windows_event(self, event, log_type: str, publishers: dict) -> Dict:
+        """Convert an EvtQuery result handle into an event record"""
+        import win32evtlog
+        
+        xml = win32evtlog.EvtRender(event, win32evtlog.EvtRenderEventXml)
+        system = ElementTree.fromstring(xml).find(f'{_EVT_NS}System')
+        provider = system.find(f'{_EVT_NS}Provider').get('Name', '')
+        event_id = int(system.findtext(f'{_EVT_NS}EventID', '0')) & 0xFFFF
+        
+        # Message templates come from the provider's metadata, opened once
+        # per provider and collection run
+        if provider not in publishers:
+            try:
+                publishers[provider] = win32evtlog.EvtOpenPublisherMetadata(provider)
+            except Exception:
+                publishers[provider] = None
+        message = ''
+        if publishers[provider] is not None:
+            try:
+                message = win32evtlog.EvtFormatMessage(
+                    publishers[provider], event, win32evtlog.EvtFormatMessageEvent
+                )
+            except Exception:
+                pass
+        
+        return {
+            "event_type": "windows_event",
+            "timestamp": system.find(f'{_EVT_NS}TimeCreated').get('SystemTime', ''),
+            "event_id": event_id,
+            "source": provider,
+            "log_type": log_type,
+            "category": int(system.findtext(f'{_EVT_NS}Task', '0')),
+            "computer": system.findtext(f'{_EVT_NS}Computer', ''),
+            "message": message,
+            "is_security_event": event_id in self.security_events,
+            "collector_source": "event_collector"
+        }
+    
     def _collect_windows_events_fallback(self) -> List[Dict]:
         """Fallback method for Windows event collection using PowerShell"""
         events = []
@@ -100,11 +204,13 @@ class EventLogCollector:
         try:
             import subprocess
             
-            # Use PowerShell to get recent security events
+            # Use PowerShell to get recent security events. Messages are cut
+            # to 500 characters in PowerShell so long ones never cross the pipe
             cmd = '''
             Get-WinEvent -FilterHashtable @{LogName='Security'; StartTime=(Get-Date).AddMinutes(-5)} -MaxEvents 100 |
-            Select-Object TimeCreated, Id, LevelDisplayName, Message |
-            ConvertTo-Json
+            Select-Object TimeCreated, Id, LevelDisplayName,
+                @{n='Message'; e={ if ($_.Message) { $_.Message.Substring(0, [Math]::Min(500, $_.Message.Length)) } else { '' } }} |
+            ConvertTo-Json -Compress
             '''
             
             result = subprocess.run(
@@ -115,8 +221,15 @@ class EventLogCollector:
             )
             
             if result.returncode == 0 and result.stdout:
-                import json
-                parsed = json.loads(result.stdout)
+                if ORJSON_AVAILABLE:
+                    parsed = orjson.loads(result.stdout)
+                else:
+                    import json
+                    parsed = json.loads(result.stdout)
+                
+                # ConvertTo-Json emits a bare object for a single event
+                if isinstance(parsed, dict):
+                    parsed = [parsed]
                 
                 if isinstance(parsed, list):
                     for event in parsed:
@@ -125,7 +238,7 @@ class EventLogCollector:
                             "timestamp": event.get('TimeCreated', ''),
                             "event_id": event.get('Id', 0),
                             "level": event.get('LevelDisplayName', ''),
-                            "message": event.get('Message', '')[:500],
+                            "message": (event.get('Message') or '')[:500],
                             "source": "event_collector"
                         })
                         
@@ -160,15 +273,9 @@ class EventLogCollector:
         """Parse syslog file"""
         events = []
         
-        # Read last N lines
-        with open(log_file, 'r') as f:
-            lines = f.readlines()[-max_lines:]
-        
-        # Syslog pattern
-        pattern = r'^(\w{3}\s+\d+\s+\d{2}:\d{2}:\d{2})\s+(\S+)\s+(\S+?)(?:\[\d+\])?:\s*(.+)$'
-        
-        for line in lines:
-            match = re.match(pattern, line.strip())
+        # Read last N lines without loading the whole file
+        for line in _tail_lines(log_file, max_lines):
+            match = _SYSLOG_RE.match(line.strip())
             if match:
                 timestamp_str, hostname, service, message = match.groups()
                 
@@ -190,22 +297,14 @@ class EventLogCollector:
     
     def _is_suspicious_log(self, message: str) -> bool:
         """Check if log message contains suspicious patterns"""
-        suspicious_patterns = [
-            r'failed password',
-            r'authentication failure',
-            r'invalid user',
-            r'connection refused',
-            r'permission denied',
-            r'segfault',
-            r'buffer overflow',
-            r'root login',
-            r'sudo:.*COMMAND',
-            r'POSSIBLE BREAK-IN',
-        ]
-        
-        message_lower = message.lower()
-        for pattern in suspicious_patterns:
-            if re.search(pattern, message_lower):
+        if _SUSPICIOUS_DB is not None:
+            try:
+                _SUSPICIOUS_DB.scan(message.encode('utf-8', 'replace'), match_event_handler=_stop_on_match)
+            except hyperscan.ScanTerminated:
                 return True
+            except hyperscan.error:
+                # e.g. scratch space busy in another thread
+                return _SUSPICIOUS_RE.search(message) is not None
+            return False
         
-        return False
+        return _SUSPICIOUS_RE.search(message) is not None
@@ -3,20 +3,30 @@ Network Collector
 Monitors network connections for suspicious activity
 """
 import psutil
-from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import socket
+import struct
 import logging
 
+from .process_snapshot import get_process_snapshot
+from .timestamps import iso_now
+
 logger = logging.getLogger(__name__)
 
+_IPV4_INT = struct.Struct('!I')
+
+# Remote ports expected for ordinary outbound traffic
+COMMON_SERVICE_PORTS = frozenset({80, 443, 53, 25, 587})
+
 
 class NetworkCollector:
     """Collects network connection information"""
     
     def __init__(self):
         self.known_connections = set()
-        self.suspicious_ports = [
+        # pid -> (create_time, name); create_time detects PID reuse
+        self._pid_names: Dict[int, Tuple[float, str]] = {}
+        self.suspicious_ports = frozenset({
             4444,   # Metasploit default
             5555,   # Android debug
             6666,   # IRC
@@ -27,7 +37,7 @@ class NetworkCollector:
             3389,   # RDP (when unexpected)
             22,     # SSH (when unexpected outbound)
             23,     # Telnet
-        ]
+        })
         
         self.suspicious_ips = set()  # Can be populated from threat intel
     
@@ -35,8 +45,10 @@ class NetworkCollector:
         """Collect network connection information"""
         connections = []
         current_connections = set()
+        seen_pids = set()
         
         try:
+            processes = get_process_snapshot()
             net_connections = psutil.net_connections(kind='inet')
             
             for conn in net_connections:
@@ -49,17 +61,27 @@ class NetworkCollector:
                     )
                     current_connections.add(conn_key)
                     
+                    # Only collect new or suspicious connections; skip the
+                    # process lookup and event for everything else
+                    is_new = conn_key not in self.known_connections
+                    is_suspicious = self._is_suspicious(conn)
+                    if not (is_new or is_suspicious):
+                        continue
+                    
                     # Get process info
                     process_name = ""
                     if conn.pid:
-                        try:
-                            process_name = psutil.Process(conn.pid).name()
-                        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                            logger.debug(f"Could not get process name for PID {conn.pid}: {e}")
+                        pinfo = processes.get(conn.pid)
+                        if pinfo is not None:
+                            process_name = pinfo['name'] or ""
+                        else:
+                            # Started after the snapshot was taken
+                            seen_pids.add(conn.pid)
+                            process_name = self._get_process_name(conn.pid)
                     
-                    connection_data = {
+                    connections.append({
                         "event_type": "network_connection",
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": iso_now(),
                         "local_address": conn.laddr.ip if conn.laddr else None,
                         "local_port": conn.laddr.port if conn.laddr else None,
                         "remote_address": conn.raddr.ip if conn.raddr else None,
@@ -67,15 +89,11 @@ class NetworkCollector:
                         "status": conn.status,
                         "pid": conn.pid,
                         "process_name": process_name,
-                        "is_new": conn_key not in self.known_connections,
-                        "is_suspicious": self._is_suspicious(conn),
+                        "is_new": is_new,
+                        "is_suspicious": is_suspicious,
                         "source": "network_collector"
-                    }
+                    })
                     
-                    # Only collect new or suspicious connections
-                    if connection_data['is_new'] or connection_data['is_suspicious']:
-                        connections.append(connection_data)
-                        
                 except Exception as e:
                     logger.warning(f"Error processing connection: {e}")
                     continue
@@ -84,8 +102,28 @@ class NetworkCollector:
             logger.error(f"Permission denied accessing network connections: {e}")
         
         self.known_connections = current_connections
+        # Forget processes that no longer own a connection
+        for pid in self._pid_names.keys() - seen_pids:
+            del self._pid_names[pid]
         return connections
     
+    def _get_process_name(self, pid: int) -> str:
+        """Get a process name, reusing the cached one while the PID is unchanged"""
+        try:
+            # Process() already reads the create time to identify the process
+            proc = psutil.Process(pid)
+            create_time = proc.create_time()
+            cached = self._pid_names.get(pid)
+            if cached and cached[0] == create_time:
+                return cached[1]
+            
+            name = proc.name()
+            self._pid_names[pid] = (create_time, name)
+            return name
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            logger.debug(f"Could not get process name for PID {pid}: {e}")
+            return ""
+    
     def _is_suspicious(self, conn) -> bool:
         """Check if connection is suspicious"""
         # Check remote port
@@ -103,7 +141,7 @@ class NetworkCollector:
         # Check for unusual established connections
         if conn.status == 'ESTABLISHED':
             # External connection on non-standard ports
-            if conn.raddr and conn.raddr.port not in [80, 443, 53, 25, 587]:
+            if conn.raddr and conn.raddr.port not in COMMON_SERVICE_PORTS:
                 if not self._is_private_ip(conn.raddr.ip):
                     return True
         
@@ -112,25 +150,18 @@ class NetworkCollector:
     def _is_private_ip(self, ip: str) -> bool:
         """Check if IP is private"""
         try:
-            parts = [int(p) for p in ip.split('.')]
-            
-            # 10.0.0.0/8
-            if parts[0] == 10:
-                return True
-            # 172.16.0.0/12
-            if parts[0] == 172 and 16 <= parts[1] <= 31:
-                return True
-            # 192.168.0.0/16
-            if parts[0] == 192 and parts[1] == 168:
-                return True
-            # 127.0.0.0/8 (localhost)
-            if parts[0] == 127:
-                return True
-                
-        except (ValueError, IndexError) as e:
+            # inet_aton parses in C; compare the address as one integer
+            n = _IPV4_INT.unpack(socket.inet_aton(ip))[0]
+        except OSError as e:
             logger.debug(f"Error parsing IP address {ip}: {e}")
+            return False
         
-        return False
+        return (
+            (n & 0xFF000000) == 0x0A000000 or     # 10.0.0.0/8
+            (n & 0xFFF00000) == 0xAC100000 or     # 172.16.0.0/12
+            (n & 0xFFFF0000) == 0xC0A80000 or     # 192.168.0.0/16
+            (n & 0xFF000000) == 0x7F000000        # 127.0.0.0/8 (localhost)
+        )
     
     def add_suspicious_ip(self, ip: str):
         """Add IP to suspicious list"""
@@ -6,6 +6,10 @@ import psutil
 from datetime import datetime
 from typing import Dict, List
 import os
+import re
+
+from .process_snapshot import get_process_snapshot
+from .timestamps import iso_now
 
 class ProcessCollector:
     """Collects process information and detects anomalies"""
@@ -17,51 +21,53 @@ class ProcessCollector:
             'certutil', 'bitsadmin', 'wmic', 'powershell -enc',
             'base64', 'wget', 'curl', 'nmap', 'masscan'
         ]
+        # One alternation scanned once per process instead of a Python loop
+        # of substring tests over every pattern
+        self._pattern_re = re.compile('|'.join(re.escape(p) for p in self.suspicious_patterns))
         
     def collect(self) -> List[Dict]:
         """Collect current process information"""
         processes = []
-        current_processes = set()
+        snapshot = get_process_snapshot().processes
+        # One C-level set difference instead of a lookup and an add per process
+        new_pids = snapshot.keys() - self.known_processes
         
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'create_time']):
-            try:
-                pinfo = proc.info
-                current_processes.add(pinfo['pid'])
-                
-                process_data = {
-                    "event_type": "process_info",
-                    "timestamp": datetime.now().isoformat(),
-                    "pid": pinfo['pid'],
-                    "process_name": pinfo['name'],
-                    "user": pinfo['username'],
-                    "cpu_usage": pinfo['cpu_percent'],
-                    "memory_usage": pinfo['memory_percent'],
-                    "cmdline": ' '.join(pinfo['cmdline']) if pinfo['cmdline'] else '',
-                    "create_time": datetime.fromtimestamp(pinfo['create_time']).isoformat() if pinfo['create_time'] else None,
-                    "is_new": pinfo['pid'] not in self.known_processes,
-                    "is_suspicious": self._is_suspicious(pinfo),
-                    "source": "process_collector"
-                }
-                
-                # Only collect new or suspicious processes
-                if process_data['is_new'] or process_data['is_suspicious']:
-                    processes.append(process_data)
-                    
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        # Shared with NetworkCollector, which joins connections to it by PID
+        for pid, pinfo in snapshot.items():
+            is_new = pid in new_pids
+            is_suspicious = self._is_suspicious(pinfo)
+            
+            # Only collect new or suspicious processes; skip building the
+            # event for everything else
+            if not (is_new or is_suspicious):
                 continue
+            
+            processes.append({
+                "event_type": "process_info",
+                "timestamp": iso_now(),
+                "pid": pid,
+                "process_name": pinfo['name'],
+                "user": pinfo['username'],
+                "cpu_usage": pinfo['cpu_percent'],
+                "memory_usage": pinfo['memory_percent'],
+                "cmdline": ' '.join(pinfo['cmdline']) if pinfo['cmdline'] else '',
+                "create_time": datetime.fromtimestamp(pinfo['create_time']).isoformat() if pinfo['create_time'] else None,
+                "is_new": is_new,
+                "is_suspicious": is_suspicious,
+                "source": "process_collector"
+            })
         
-        self.known_processes = current_processes
+        self.known_processes = set(snapshot)
         return processes
     
     def _is_suspicious(self, pinfo: Dict) -> bool:
         """Check if process is suspicious"""
-        name = (pinfo.get('name') or '').lower()
-        cmdline = ' '.join(pinfo.get('cmdline') or []).lower()
+        # NUL keeps a match from spanning the name and the command line
+        blob = f"{pinfo.get('name') or ''}\0{' '.join(pinfo.get('cmdline') or [])}".lower()
         
         # Check against suspicious patterns
-        for pattern in self.suspicious_patterns:
-            if pattern in name or pattern in cmdline:
-                return True
+        if self._pattern_re.search(blob):
+            return True
         
         # Check for unusual characteristics
         cpu = pinfo.get('cpu_percent', 0) or 0
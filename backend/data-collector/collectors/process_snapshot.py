@@ -0,0 +1,148 @@
+"""
+Process Snapshot
+One shared walk of the process table per collection cycle
+"""
+import psutil
+import os
+import pwd
+import sys
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+SNAPSHOT_ATTRS = ['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'create_time']
+
+# Collectors run back to back within a cycle; a snapshot younger than this
+# (seconds) is reused instead of walking /proc again
+SNAPSHOT_TTL = 1.0
+
+# On Linux the snapshot reads /proc directly; elsewhere it goes through psutil
+PROCFS_AVAILABLE = sys.platform.startswith('linux') and os.path.isdir('/proc/self')
+
+if PROCFS_AVAILABLE:
+    _CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+    _BOOT_TIME = psutil.boot_time()
+    _TOTAL_MEMORY = psutil.virtual_memory().total
+
+# psutil truncates comm to this length and recovers the rest from cmdline
+_COMM_LENGTH = 15
+
+# (pid, start ticks) -> (cpu ticks, monotonic time) from the previous walk
+_cpu_times: Dict[tuple, tuple] = {}
+_usernames: Dict[int, str] = {}
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _username(uid: int) -> str:
+    """Resolve a uid, caching the passwd lookup"""
+    name = _usernames.get(uid)
+    if name is None:
+        try:
+            name = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            name = str(uid)
+        _usernames[uid] = name
+    return name
+
+
+def _read_proc(pid: int, now: float, cpu_times: Dict[tuple, tuple]) -> Dict:
+    """Read one process's info from stat, status and cmdline"""
+    stat = _read(f'/proc/{pid}/stat')
+    # comm may contain spaces and parentheses; it ends at the last ')'
+    name_end = stat.rfind(b')')
+    name = os.fsdecode(stat[stat.find(b'(') + 1:name_end])
+    fields = stat[name_end + 2:].split()
+    # Fields from state (3) onwards: utime 14, stime 15, starttime 22, rss 24
+    cpu_ticks = int(fields[11]) + int(fields[12])
+    start_ticks = int(fields[19])
+    rss_pages = int(fields[21])
+    
+    uid = 0
+    for line in _read(f'/proc/{pid}/status').splitlines():
+        if line.startswith(b'Uid:'):
+            uid = int(line.split()[1])
+            break
+    
+    cmdline = [os.fsdecode(arg) for arg in _read(f'/proc/{pid}/cmdline').split(b'\0')]
+    if cmdline and not cmdline[-1]:
+        cmdline.pop()
+    if len(name) >= _COMM_LENGTH and cmdline:
+        exe_name = os.path.basename(cmdline[0])
+        if exe_name.startswith(name):
+            name = exe_name
+    
+    # Same measure as psutil's cpu_percent(interval=None): CPU time since
+    # the previous walk over wall time, 0.0 the first time a process is seen
+    key = (pid, start_ticks)
+    cpu_percent = 0.0
+    previous = _cpu_times.get(key)
+    if previous is not None and now > previous[1]:
+        cpu_percent = round((cpu_ticks - previous[0]) / _CLOCK_TICKS / (now - previous[1]) * 100, 1)
+    cpu_times[key] = (cpu_ticks, now)
+    
+    return {
+        'pid': pid,
+        'name': name,
+        'username': _username(uid),
+        'cpu_percent': cpu_percent,
+        'memory_percent': rss_pages * _PAGE_SIZE / _TOTAL_MEMORY * 100,
+        'cmdline': cmdline,
+        'create_time': _BOOT_TIME + start_ticks / _CLOCK_TICKS
+    }
+
+
+def _iter_procfs() -> Iterator[Dict]:
+    """Walk /proc with scandir, reading only the files the collectors use"""
+    global _cpu_times
+    
+    now = time.monotonic()
+    cpu_times = {}
+    with os.scandir('/proc') as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                yield _read_proc(int(entry.name), now, cpu_times)
+            except (FileNotFoundError, ProcessLookupError, PermissionError, IndexError, ValueError):
+                # Exited mid-read, hidden by hidepid, or a torn read
+                continue
+    
+    # Only processes still running carry their CPU times forward
+    _cpu_times = cpu_times
+
+
+class ProcessSnapshot:
+    """pid -> process info for every process, taken in one pass"""
+    
+    def __init__(self):
+        self.taken_at = time.monotonic()
+        if PROCFS_AVAILABLE:
+            self.processes: Dict[int, Dict] = {info['pid']: info for info in _iter_procfs()}
+        else:
+            self.processes = {
+                proc.info['pid']: proc.info
+                for proc in psutil.process_iter(SNAPSHOT_ATTRS)
+            }
+    
+    def get(self, pid: int) -> Optional[Dict]:
+        """Get the info recorded for a PID"""
+        return self.processes.get(pid)
+
+
+_snapshot: Optional[ProcessSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_process_snapshot(max_age: float = SNAPSHOT_TTL) -> ProcessSnapshot:
+    """Get the shared snapshot, retaking it when older than max_age"""
+    global _snapshot
+    
+    with _snapshot_lock:
+        if _snapshot is None or time.monotonic() - _snapshot.taken_at > max_age:
+            _snapshot = ProcessSnapshot()
+        return _snapshot
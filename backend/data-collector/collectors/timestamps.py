@@ -0,0 +1,29 @@
+"""
+Timestamps
+Cached ISO-8601 formatting for per-event timestamps
+"""
+import time
+from datetime import datetime
+
+# (whole second, its ISO string), replaced as one tuple so a reader on
+# another thread never pairs a second with the wrong string
+_second_cache = (None, "")
+
+
+def iso_timestamp(ts: float) -> str:
+    """Format a POSIX timestamp as a local ISO-8601 string with microseconds"""
+    global _second_cache
+    
+    second = int(ts)
+    cached_second, prefix = _second_cache
+    if cached_second != second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _second_cache = (second, prefix)
+    
+    micros = min(round((ts - second) * 1_000_000), 999_999)
+    return f"{prefix}.{micros:06d}"
+
+
+def iso_now() -> str:
+    """Current local time as an ISO-8601 string"""
+    return iso_timestamp(time.time())
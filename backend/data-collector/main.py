@@ -6,12 +6,21 @@ import asyncio
 import json
 import signal
 import sys
-from datetime import datetime
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import httpx
 import os
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 # Add parent directory to path for common imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -70,6 +79,66 @@ load_dotenv()
 # Initialize logger
 logger = get_logger("data-collector")
 
+# Per-request timeouts (seconds) for the pooled HTTP clients
+HTTP_TIMEOUTS = {
+    "ml_batch": 30.0,
+    "ml_single": 10.0,
+    "alert": 10.0
+}
+
+# Bounds for the adaptive ML batch size
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 500
+
+# Weight of the newest /analyze/batch latency in the moving average
+ML_LATENCY_SMOOTHING = 0.2
+
+# Response header carrying the ML engine's own time spent on a batch
+PROCESS_TIME_HEADER = "X-Process-Time"
+
+# /analyze/batch requests kept in flight at once
+MAX_INFLIGHT_BATCHES = 4
+
+# Alerts posted to the API at once when a batch yields several threats
+MAX_CONCURRENT_ALERTS = 16
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Cycles of Redis writes waiting for the background writer; when it falls
+# this far behind, new cycles' log cache writes are dropped and their alerts
+# and updates are sent directly
+REDIS_QUEUE_SIZE = 64
+
+# Queued cycles the writer folds into one pipeline
+REDIS_FLUSH_BATCH = 8
+
+# Content hashes of recently forwarded logs; repeats are dropped before the
+# ML engine and the Redis cache
+DEDUP_CACHE_SIZE = 8192
+
+# Seconds a forwarded log suppresses its repeats; conditions that persist
+# (an open suspicious connection, a recurring syslog line) are re-analysed
+# once this has passed since they were first forwarded
+DEDUP_TTL = 120
+
+# Per-event metadata that differs between otherwise identical logs
+DEDUP_IGNORED_FIELDS = ("collection_id", "collected_at", "timestamp")
+
+
+def _json_body(payload) -> bytes:
+    """Serialize a request body, with orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+def _log_hash(log: Dict) -> int:
+    """Hash a log's content, ignoring per-event metadata"""
+    content = {k: v for k, v in log.items() if k not in DEDUP_IGNORED_FIELDS}
+    if ORJSON_AVAILABLE:
+        return hash(orjson.dumps(content, option=orjson.OPT_SORT_KEYS, default=str))
+    return hash(json.dumps(content, sort_keys=True, default=str))
+
 
 class DataCollectorService:
     """
@@ -82,6 +151,20 @@ class DataCollectorService:
         self.ml_engine_url = os.getenv("ML_ENGINE_URL", "http://localhost:5000")
         self.internal_api_key = os.getenv("INTERNAL_API_KEY", "fortifai-internal-service-key")
         
+        # One pooled client per destination, kept open across collection
+        # cycles so batches and alerts reuse keep-alive connections
+        http_limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        self.ml_client = httpx.AsyncClient(
+            base_url=self.ml_engine_url,
+            timeout=HTTP_TIMEOUTS["ml_batch"],
+            limits=http_limits
+        )
+        self.api_client = httpx.AsyncClient(
+            base_url=self.api_url,
+            timeout=HTTP_TIMEOUTS["alert"],
+            limits=http_limits
+        )
+        
         # Initialize collectors
         self.collectors = {
             'file': FileLogCollector(),
@@ -93,6 +176,21 @@ class DataCollectorService:
         self.running = False
         self.collection_interval = int(os.getenv("COLLECTION_INTERVAL", 30))
         self.batch_size = int(os.getenv("BATCH_SIZE", 50))
+        # Batches grow while the ML engine answers well under this many
+        # seconds and shrink when it is slower
+        self.ml_latency_target = float(os.getenv("ML_LATENCY_TARGET", 2.0))
+        self._ml_latency: Optional[float] = None
+        self._inflight_batches = 0
+        # Content hash -> monotonic time first forwarded, oldest first
+        self._seen_logs: OrderedDict = OrderedDict()
+        # id(log) -> content hash for this cycle's logs, until the ML engine
+        # has accepted them
+        self._log_hashes: Dict[int, int] = {}
+        self._pending_alerts: List[Dict] = []
+        
+        # Redis writes are queued per cycle and sent by a background task
+        self._redis_queue: asyncio.Queue = asyncio.Queue(maxsize=REDIS_QUEUE_SIZE)
+        self._redis_writer: Optional[asyncio.Task] = None
         
         # Initialize Redis client for caching (optional)
         self.redis_client = None
@@ -113,7 +211,9 @@ class DataCollectorService:
             "total_collected": 0,
             "total_threats": 0,
             "total_alerts": 0,
+            "total_duplicates": 0,
             "collection_errors": 0,
+            # Epoch seconds; get_stats() formats them for output
             "start_time": None,
             "last_collection": None,
             "collector_stats": {name: {"collected": 0, "errors": 0} for name in self.collectors}
@@ -122,7 +222,7 @@ class DataCollectorService:
     async def start(self):
         """Start the data collection service"""
         self.running = True
-        self.stats["start_time"] = datetime.now().isoformat()
+        self.stats["start_time"] = time.time()
         
         logger.info(
             "data_collector_started",
@@ -132,10 +232,13 @@ class DataCollectorService:
         )
         print(f"🔍 Data Collector Started - Interval: {self.collection_interval}s")
         
+        if self.redis_client:
+            self._redis_writer = asyncio.create_task(self._drain_redis_queue())
+        
         while self.running:
             try:
                 await self.collect_and_process()
-                self.stats["last_collection"] = datetime.now().isoformat()
+                self.stats["last_collection"] = time.time()
             except Exception as e:
                 self.stats["collection_errors"] += 1
                 logger.error("collection_cycle_error", error=str(e))
@@ -154,7 +257,19 @@ class DataCollectorService:
             except Exception as e:
                 logger.warning(f"Error stopping file collector: {e}")
         
-        logger.info("data_collector_stopped", stats=self.stats)
+        # Give queued Redis writes a moment to go out, then stop the writer
+        if self._redis_writer:
+            writer, self._redis_writer = self._redis_writer, None
+            try:
+                await asyncio.wait_for(self._redis_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("redis_queue_not_drained", pending=self._redis_queue.qsize())
+            writer.cancel()
+        
+        await self.ml_client.aclose()
+        await self.api_client.aclose()
+        
+        logger.info("data_collector_stopped", stats=self.get_stats())
         print("🛑 Data Collector Stopped")
     
     def get_health_status(self) -> Dict:
@@ -162,7 +277,7 @@ class DataCollectorService:
         return {
             "status": "healthy" if self.running else "stopped",
             "uptime": self._calculate_uptime(),
-            "stats": self.stats,
+            "stats": self.get_stats(),
             "collectors": {
                 name: {
                     "active": True,
@@ -172,30 +287,36 @@ class DataCollectorService:
             }
         }
     
+    def get_stats(self) -> Dict:
+        """Get statistics with their epoch timestamps formatted as ISO strings"""
+        stats = dict(self.stats)
+        for key in ("start_time", "last_collection"):
+            if stats[key] is not None:
+                stats[key] = datetime.fromtimestamp(stats[key]).isoformat()
+        return stats
+    
     def _calculate_uptime(self) -> str:
         """Calculate service uptime"""
         if not self.stats["start_time"]:
             return "0s"
-        start = datetime.fromisoformat(self.stats["start_time"])
-        delta = datetime.now() - start
-        return str(delta)
+        return str(timedelta(seconds=time.time() - self.stats["start_time"]))
     
     async def collect_and_process(self):
         """Collect data from all sources and process"""
         timestamp = datetime.now().isoformat()
         
         # Collect from all sources concurrently
+        collector_names = list(self.collectors)
         collection_tasks = [
-            self._collect_from_source(name, collector)
-            for name, collector in self.collectors.items()
+            self._collect_from_source(name, self.collectors[name], timestamp)
+            for name in collector_names
         ]
         
         results = await asyncio.gather(*collection_tasks, return_exceptions=True)
         
         # Process collected data
         all_logs = []
-        for i, result in enumerate(results):
-            collector_name = list(self.collectors.keys())[i]
+        for collector_name, result in zip(collector_names, results):
             if isinstance(result, Exception):
                 self.stats["collector_stats"][collector_name]["errors"] += 1
                 logger.error("collector_error", collector=collector_name, error=str(result))
@@ -205,28 +326,70 @@ class DataCollectorService:
             all_logs.extend(result)
         
         self.stats["total_collected"] += len(all_logs)
+        all_logs = self._drop_duplicates(all_logs)
         
         if all_logs:
-            # Cache collected data if Redis available
-            if self.redis_client:
-                await self._cache_logs(all_logs)
-            
-            # Send to ML engine in batches
+            # Send to ML engine in batches; alerts raised along the way are
+            # held for the Redis flush below
+            self._pending_alerts = []
             await self._send_to_ml_engine_batch(all_logs)
             
-            # Publish real-time updates via Redis
+            # Cache logs and alerts and publish real-time updates in the
+            # background, without holding up the next cycle
             if self.redis_client:
-                await self._publish_updates(all_logs)
+                await self._queue_redis_writes(all_logs, self._pending_alerts)
+            self._pending_alerts = []
+        
+        self._log_hashes = {}
+    
+    def _drop_duplicates(self, logs: List[Dict]) -> List[Dict]:
+        """Drop logs whose content was forwarded recently or repeats within the cycle"""
+        seen = self._seen_logs
+        expired_before = time.monotonic() - DEDUP_TTL
+        while seen and next(iter(seen.values())) < expired_before:
+            seen.popitem(last=False)
+        
+        # Logs only count as seen once the ML engine accepts them, see
+        # _mark_forwarded; until then the hashes wait here
+        self._log_hashes = {}
+        cycle_hashes = set()
+        unique = []
+        for log in logs:
+            h = _log_hash(log)
+            if h in seen or h in cycle_hashes:
+                continue
+            cycle_hashes.add(h)
+            self._log_hashes[id(log)] = h
+            unique.append(log)
+        
+        self.stats["total_duplicates"] += len(logs) - len(unique)
+        return unique
+    
+    def _mark_forwarded(self, logs: List[Dict]):
+        """Record logs the ML engine accepted so their repeats are dropped"""
+        seen = self._seen_logs
+        now = time.monotonic()
+        for log in logs:
+            h = self._log_hashes.pop(id(log), None)
+            if h is not None and h not in seen:
+                seen[h] = now
+        
+        while len(seen) > DEDUP_CACHE_SIZE:
+            seen.popitem(last=False)
     
-    async def _collect_from_source(self, name: str, collector) -> List[Dict]:
+    async def _collect_from_source(self, name: str, collector, timestamp: str) -> List[Dict]:
         """Collect data from a single source"""
         try:
-            logs = collector.collect()
+            # Collectors block on psutil and the filesystem; run each in a
+            # worker thread so they overlap instead of stalling the loop
+            logs = await asyncio.to_thread(collector.collect)
             
-            # Add metadata to each log
-            for log in logs:
-                log["collection_id"] = generate_id(f"col-{name}")
-                log["collected_at"] = datetime.now().isoformat()
+            # Add metadata to each log: the cycle's timestamp, and IDs made
+            # unique by a per-source prefix plus the log's position
+            id_prefix = generate_id(f"col-{name}")
+            for i, log in enumerate(logs):
+                log["collection_id"] = f"{id_prefix}-{i}"
+                log["collected_at"] = timestamp
             
             logger.debug("collector_success", collector=name, count=len(logs))
             return logs
@@ -235,76 +398,166 @@ class DataCollectorService:
             print(f"Error collecting from {name}: {e}")
             return []
     
-    async def _cache_logs(self, logs: List[Dict]):
-        """Cache collected logs in Redis"""
+    async def _queue_redis_writes(self, logs: List[Dict], alerts: List[Dict]):
+        """Hand a cycle's logs and alerts to the background Redis writer"""
         try:
-            for log in logs:
-                log_id = log.get("collection_id", generate_id("log"))
-                self.redis_client.set(f"log:{log_id}", log, expire=3600)  # 1 hour TTL
-        except Exception as e:
-            logger.warning("cache_error", error=str(e))
+            self._redis_queue.put_nowait((logs, alerts))
+        except asyncio.QueueFull:
+            # Only the log cache is expendable; alerts and real-time updates
+            # still go out, on their own round trip
+            logger.warning("redis_queue_full", dropped_logs=len(logs))
+            await asyncio.to_thread(self._flush_to_redis, [(logs, alerts)], False)
     
-    async def _publish_updates(self, logs: List[Dict]):
-        """Publish real-time updates via Redis pub/sub"""
+    async def _drain_redis_queue(self):
+        """Send queued cycles to Redis, several per pipeline"""
+        while True:
+            cycles = [await self._redis_queue.get()]
+            while len(cycles) < REDIS_FLUSH_BATCH and not self._redis_queue.empty():
+                cycles.append(self._redis_queue.get_nowait())
+            
+            try:
+                # redis-py is synchronous; keep the round trip off the loop
+                await asyncio.to_thread(self._flush_to_redis, cycles)
+            finally:
+                for _ in cycles:
+                    self._redis_queue.task_done()
+    
+    def _flush_to_redis(self, cycles: List[tuple], cache_logs: bool = True):
+        """Queue the cycles' Redis writes on one pipeline and send them"""
         try:
-            suspicious_logs = [l for l in logs if l.get("is_suspicious", False)]
-            if suspicious_logs:
-                self.redis_client.publish("security:events", {
-                    "type": "suspicious_activity",
-                    "count": len(suspicious_logs),
-                    "timestamp": datetime.now().isoformat(),
-                    "summary": [
-                        {"type": l.get("event_type"), "source": l.get("source")}
-                        for l in suspicious_logs[:10]  # Limit to 10
-                    ]
-                })
+            pipe = self.redis_client.pipeline()
+            for logs, alerts in cycles:
+                if cache_logs:
+                    self._cache_logs(logs, pipe)
+                if alerts:
+                    self.redis_client.cache_and_publish_alerts(alerts, pipe=pipe)
+                self._publish_updates(logs, pipe)
+            pipe.execute()
         except Exception as e:
-            logger.warning("publish_error", error=str(e))
+            logger.warning("redis_flush_error", error=str(e))
+    
+    def _cache_logs(self, logs: List[Dict], pipe):
+        """Cache collected logs in Redis"""
+        # 1 hour TTL
+        self.redis_client.set_many(
+            {f"log:{log.get('collection_id') or generate_id('log')}": log for log in logs},
+            expire=3600,
+            pipe=pipe
+        )
+    
+    def _publish_updates(self, logs: List[Dict], pipe):
+        """Publish real-time updates via Redis pub/sub"""
+        suspicious_logs = [l for l in logs if l.get("is_suspicious", False)]
+        if suspicious_logs:
+            self.redis_client.publish("security:events", {
+                "type": "suspicious_activity",
+                "count": len(suspicious_logs),
+                "timestamp": datetime.now().isoformat(),
+                "summary": [
+                    {"type": l.get("event_type"), "source": l.get("source")}
+                    for l in suspicious_logs[:10]  # Limit to 10
+                ]
+            }, pipe=pipe)
     
     async def _send_to_ml_engine_batch(self, logs: List[Dict]):
         """Send collected logs to ML engine in batches for analysis"""
-        headers = {"Content-Type": "application/json"}
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Process in batches
-            for i in range(0, len(logs), self.batch_size):
-                batch = logs[i:i + self.batch_size]
-                sanitized_batch = [self._sanitize_log(log) for log in batch]
+        batches = self._iter_batches(logs)
+        
+        # Workers share one batch generator, so each batch is cut at the
+        # batch size current when a worker frees up
+        async def worker():
+            for batch in batches:
+                await self._analyze_batch(batch)
+        
+        await asyncio.gather(*(worker() for _ in range(MAX_INFLIGHT_BATCHES)))
+    
+    def _iter_batches(self, logs: List[Dict]):
+        """Yield consecutive batches of logs at the current batch size"""
+        i = 0
+        while i < len(logs):
+            batch = logs[i:i + self.batch_size]
+            i += len(batch)
+            yield batch
+    
+    async def _analyze_batch(self, batch: List[Dict]):
+        """Send one batch to the ML engine and raise alerts for its threats"""
+        sanitized_batch = [self._sanitize_log(log) for log in batch]
+        
+        try:
+            # Send batch to ML engine
+            started = time.perf_counter()
+            self._inflight_batches += 1
+            try:
+                response = await self.ml_client.post(
+                    "/analyze/batch",
+                    content=_json_body({"logs": sanitized_batch}),
+                    headers=JSON_HEADERS,
+                    timeout=HTTP_TIMEOUTS["ml_batch"]
+                )
+                inflight = self._inflight_batches
+            finally:
+                self._inflight_batches -= 1
+            
+            if response.status_code == 200:
+                self._adjust_batch_size(
+                    self._batch_latency(response, time.perf_counter() - started, inflight)
+                )
+                self._mark_forwarded(batch)
+                results = response.json()
+                threats = results.get("threats", [])
                 
-                try:
-                    # Send batch to ML engine
-                    response = await client.post(
-                        f"{self.ml_engine_url}/analyze/batch",
-                        json={"logs": sanitized_batch},
-                        headers=headers,
-                        timeout=30.0
-                    )
+                detections = []
+                for threat in threats:
+                    self.stats["total_threats"] += 1
+                    log_index = threat.get("log_index", 0)
+                    original_log = batch[log_index] if log_index < len(batch) else {}
+                    detections.append((original_log, threat))
                     
-                    if response.status_code == 200:
-                        results = response.json()
-                        threats = results.get("threats", [])
-                        
-                        for threat in threats:
-                            self.stats["total_threats"] += 1
-                            log_index = threat.get("log_index", 0)
-                            original_log = batch[log_index] if log_index < len(batch) else {}
-                            await self._create_alert(original_log, threat)
-                            
-                            # Log threat detection
-                            if self.security_logger:
-                                self.security_logger.log_threat_detection(
-                                    threat_type=threat.get("threat_type", "unknown"),
-                                    confidence=threat.get("confidence", 0),
-                                    details={"log": original_log, "analysis": threat}
-                                )
-                    else:
-                        logger.warning("ml_engine_error", status=response.status_code)
-                        # Fallback to individual processing
-                        await self._send_to_ml_engine(batch)
-                        
-                except httpx.HTTPError as e:
-                    logger.error("ml_engine_batch_error", error=str(e))
-                    # Fallback to individual processing on error
-                    await self._send_to_ml_engine(batch)
+                    # Log threat detection
+                    if self.security_logger:
+                        self.security_logger.log_threat_detection(
+                            threat_type=threat.get("threat_type", "unknown"),
+                            confidence=threat.get("confidence", 0),
+                            details={"log": original_log, "analysis": threat}
+                        )
+                
+                await self._create_alerts(detections)
+            else:
+                logger.warning("ml_engine_error", status=response.status_code)
+                # Fallback to individual processing
+                await self._send_to_ml_engine(batch)
+                
+        except httpx.HTTPError as e:
+            logger.error("ml_engine_batch_error", error=str(e))
+            # Fallback to individual processing on error
+            await self._send_to_ml_engine(batch)
+    
+    def _batch_latency(self, response: httpx.Response, elapsed: float, inflight: int) -> float:
+        """Get the ML engine's time on one batch, without queueing behind the others in flight"""
+        # The ML engine scores batches one at a time, so a batch's round
+        # trip includes the batches ahead of it
+        try:
+            return float(response.headers[PROCESS_TIME_HEADER])
+        except (KeyError, ValueError):
+            return elapsed / max(inflight, 1)
+    
+    def _adjust_batch_size(self, latency: float):
+        """Resize batches from the moving average of ML engine latency"""
+        if self._ml_latency is None:
+            self._ml_latency = latency
+        else:
+            self._ml_latency += ML_LATENCY_SMOOTHING * (latency - self._ml_latency)
+        
+        if self._ml_latency < self.ml_latency_target / 2:
+            new_size = min(self.batch_size * 2, MAX_BATCH_SIZE)
+        elif self._ml_latency > self.ml_latency_target:
+            new_size = max(self.batch_size // 2, MIN_BATCH_SIZE)
+        else:
+            return
+        
+        if new_size != self.batch_size:
+            logger.debug("batch_size_adjusted", batch_size=new_size, latency=round(self._ml_latency, 3))
+            self.batch_size = new_size
     
     def _sanitize_log(self, log: Dict) -> Dict:
         """Sanitize log data to ensure JSON serialization"""
@@ -323,79 +576,93 @@ class DataCollectorService:
     
     async def _send_to_ml_engine(self, logs: List[Dict]):
         """Send collected logs to ML engine individually (fallback method)"""
-        headers = {"Content-Type": "application/json"}
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            try:
-                for log in logs:
-                    sanitized_log = self._sanitize_log(log)
-                    response = await client.post(
-                        f"{self.ml_engine_url}/analyze",
-                        json={"log_data": sanitized_log},
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get("is_threat", False):
-                            self.stats["total_threats"] += 1
-                            await self._create_alert(log, result)
-                    elif response.status_code == 422:
-                        logger.warning("ml_engine_validation_error", 
-                                     status=response.status_code,
-                                     response=response.text,
-                                     log_keys=list(sanitized_log.keys()))
-                            
-            except httpx.HTTPError as e:
-                logger.error("ml_engine_communication_error", error=str(e))
-                print(f"ML Engine communication error: {e}")
+        try:
+            for log in logs:
+                sanitized_log = self._sanitize_log(log)
+                response = await self.ml_client.post(
+                    "/analyze",
+                    content=_json_body({"log_data": sanitized_log}),
+                    headers=JSON_HEADERS,
+                    timeout=HTTP_TIMEOUTS["ml_single"]
+                )
+                
+                if response.status_code == 200:
+                    self._mark_forwarded([log])
+                    result = response.json()
+                    if result.get("is_threat", False):
+                        self.stats["total_threats"] += 1
+                        await self._create_alert(log, result)
+                elif response.status_code == 422:
+                    logger.warning("ml_engine_validation_error", 
+                                 status=response.status_code,
+                                 response=response.text,
+                                 log_keys=list(sanitized_log.keys()))
+                        
+        except httpx.HTTPError as e:
+            logger.error("ml_engine_communication_error", error=str(e))
+            print(f"ML Engine communication error: {e}")
     
     async def _create_alert(self, log: Dict, analysis: Dict):
         """Create an alert for detected threats"""
-        self.stats["total_alerts"] += 1
+        await self._create_alerts([(log, analysis)])
+    
+    async def _create_alerts(self, detections: List[tuple]):
+        """Create alerts for (log, analysis) pairs, posting them concurrently"""
+        if not detections:
+            return
         
-        async with httpx.AsyncClient() as client:
-            try:
-                alert_id = generate_id("alert")
-                risk_score = analysis.get('risk_score', analysis.get('confidence', 0.5))
-                
-                alert_data = {
-                    "id": alert_id,
-                    "title": f"Threat Detected: {analysis.get('threat_type', 'Unknown')}",
-                    "message": f"Confidence: {analysis.get('confidence', 0):.2%}",
-                    "severity": self._get_severity(risk_score),
-                    "source": log.get("source", "data-collector"),
-                    "threat_type": analysis.get("threat_type", "unknown"),
-                    "confidence": analysis.get("confidence", 0),
-                    "risk_score": risk_score,
-                    "metadata": {
-                        "log": log,
-                        "analysis": analysis
-                    },
-                    "created_at": datetime.now().isoformat()
-                }
-                
-                # Cache alert in Redis
-                if self.redis_client:
-                    self.redis_client.cache_alert(alert_id, alert_data)
-                    # Publish real-time alert
-                    self.redis_client.publish("alerts:new", alert_data)
-                
-                response = await client.post(
-                    f"{self.api_url}/api/v1/alerts/internal",
-                    json=alert_data,
-                    headers={"X-Internal-Key": self.internal_api_key},
-                    timeout=10.0
-                )
+        self.stats["total_alerts"] += len(detections)
+        alerts = [self._build_alert(log, analysis) for log, analysis in detections]
+        
+        # Cached and published with the rest of the cycle's Redis writes
+        self._pending_alerts.extend(alerts)
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ALERTS)
+        
+        async def post(alert_data: Dict):
+            async with semaphore:
+                await self._post_alert(alert_data)
+        
+        await asyncio.gather(*(post(alert_data) for alert_data in alerts))
+    
+    def _build_alert(self, log: Dict, analysis: Dict) -> Dict:
+        """Build the alert payload for a detected threat"""
+        risk_score = analysis.get('risk_score', analysis.get('confidence', 0.5))
+        
+        return {
+            "id": generate_id("alert"),
+            "title": f"Threat Detected: {analysis.get('threat_type', 'Unknown')}",
+            "message": f"Confidence: {analysis.get('confidence', 0):.2%}",
+            "severity": self._get_severity(risk_score),
+            "source": log.get("source", "data-collector"),
+            "threat_type": analysis.get("threat_type", "unknown"),
+            "confidence": analysis.get("confidence", 0),
+            "risk_score": risk_score,
+            "metadata": {
+                "log": log,
+                "analysis": analysis
+            },
+            "created_at": datetime.now().isoformat()
+        }
+    
+    async def _post_alert(self, alert_data: Dict):
+        """Send an alert to the API"""
+        try:
+            response = await self.api_client.post(
+                "/api/v1/alerts/internal",
+                content=_json_body(alert_data),
+                headers={**JSON_HEADERS, "X-Internal-Key": self.internal_api_key},
+                timeout=HTTP_TIMEOUTS["alert"]
+            )
+            
+            if response.status_code in [200, 201]:
+                logger.info("alert_created", alert_id=alert_data["id"], severity=alert_data["severity"])
+            else:
+                logger.warning("alert_creation_failed", status=response.status_code)
                 
-                if response.status_code in [200, 201]:
-                    logger.info("alert_created", alert_id=alert_id, severity=alert_data["severity"])
-                else:
-                    logger.warning("alert_creation_failed", status=response.status_code)
-                    
-            except httpx.HTTPError as e:
-                logger.error("alert_creation_error", error=str(e))
-                print(f"Alert creation error: {e}")
+        except httpx.HTTPError as e:
+            logger.error("alert_creation_error", error=str(e))
+            print(f"Alert creation error: {e}")
     
     def _get_severity(self, risk_score: float) -> str:
         """Convert risk score to severity level"""
@@ -443,7 +710,7 @@ class HealthCheckServer:
     async def stats_handler(self, request):
         """Stats endpoint"""
         from aiohttp import web
-        return web.json_response(self.service.stats)
+        return web.json_response(self.service.get_stats())
     
     async def ready_handler(self, request):
         """Readiness probe endpoint"""
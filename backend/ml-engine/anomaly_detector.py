@@ -8,8 +8,56 @@ import numpy as np
 import joblib
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    onnxruntime = None
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    SKL2ONNX_AVAILABLE = True
+except ImportError:
+    convert_sklearn = None
+    FloatTensorType = None
+    SKL2ONNX_AVAILABLE = False
+
+# Forest exported for onnxruntime, next to isolation_forest.joblib
+ONNX_MODEL_FILE = 'iforest.onnx'
+
+# Scaler parameters, baseline statistics and feature names in one archive,
+# replacing anomaly_scaler.joblib, baseline_stats.json and feature_names.json
+BASELINE_FILE = 'baseline.npz'
+
+# Forest scores remembered per scaled feature vector; idle hosts send the
+# same vectors over and over
+SCORE_CACHE_SIZE = 4096
+
+# Features are float32 end to end: the forest's trees compare in float32
+# anyway, so float64 input only costs a conversion and twice the bandwidth
+FEATURE_DTYPE = np.float32
+
+
+@lru_cache(maxsize=4096)
+def _parse_time_parts(timestamp: str) -> Optional[tuple]:
+    """
+    Parse a timestamp into (hour, day of week, is business hours); cached
+    because logs from one collection cycle share their timestamps
+    """
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    hour, day = dt.hour, dt.weekday()
+    return hour, day, day < 5 and 8 <= hour <= 18
+
 
 class AnomalyDetector:
     """
@@ -23,8 +71,22 @@ class AnomalyDetector:
             random_state=42
         )
         self.scaler = StandardScaler()
+        # onnxruntime session for the forest when an ONNX export is available
+        self.session = None
+        # Fitted scaler mean and scale as float32, once a scaler is fitted
+        self._scaler_params = None
+        # Reused output buffer for scaled features, grown to the largest
+        # batch seen; the service calls detect from the event loop only
+        self._scratch = np.empty((1, 8), dtype=FEATURE_DTYPE)
+        # Scaled feature bytes -> decision_function score for the current model
+        self._score_cache: OrderedDict = OrderedDict()
         self.is_trained = False
         self.baseline_stats = {}
+        # Baseline mean and std as arrays, with a std safe to divide by and
+        # a mask of the features that vary at all
+        self._baseline_mean = None
+        self._baseline_std = None
+        self._baseline_varies = None
         self.feature_names = []
         
         # Try to load pre-trained model
@@ -47,15 +109,14 @@ class AnomalyDetector:
         """Load pre-trained anomaly detector"""
         try:
             self.model = joblib.load(f'{path}/isolation_forest.joblib')
-            self.scaler = joblib.load(f'{path}/anomaly_scaler.joblib')
-            
-            if os.path.exists(f'{path}/baseline_stats.json'):
-                with open(f'{path}/baseline_stats.json', 'r') as f:
-                    self.baseline_stats = json.load(f)
+            self.session = self._load_onnx_session(path)
+            self._score_cache.clear()
             
-            if os.path.exists(f'{path}/feature_names.json'):
-                with open(f'{path}/feature_names.json', 'r') as f:
-                    self.feature_names = json.load(f)
+            if os.path.exists(f'{path}/{BASELINE_FILE}'):
+                self._load_baseline(f'{path}/{BASELINE_FILE}')
+            else:
+                self._load_legacy_baseline(path)
+            self._cache_scaler_params()
             
             self.is_trained = True
             print(f"✓ Loaded anomaly detector from {path}")
@@ -76,9 +137,12 @@ class AnomalyDetector:
         
         # Scale features
         features_scaled = self.scaler.fit_transform(features)
+        self._cache_scaler_params()
         
-        # Train model
+        # Train model; any loaded ONNX export belongs to the old forest
         self.model.fit(features_scaled)
+        self.session = None
+        self._score_cache.clear()
         
         # Calculate baseline statistics
         self._calculate_baseline(features)
@@ -93,30 +157,124 @@ class AnomalyDetector:
     
     def detect(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Detect if data point is anomalous"""
-        features, _ = self._extract_features_batch([data])
+        return self.detect_batch([data])[0]
+    
+    def detect_batch(self, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Detect anomalies for several data points with one model call"""
+        if not data_list:
+            return []
+        
+        features, _ = self._extract_features_batch(data_list)
         
         if not self.is_trained:
             # Use statistical detection if not trained
-            return self._statistical_detection(data, features[0])
+            return [
+                self._statistical_detection(data, row)
+                for data, row in zip(data_list, features)
+            ]
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        # Scale and score the whole batch at once; IsolationForest.predict
+        # is just decision_function < 0, so one pass gives both
+        features_scaled = self._scale(features)
+        scores = self._cached_scores(features_scaled)
+        timestamp = datetime.now().isoformat()
         
-        # Predict (-1 for anomaly, 1 for normal)
-        prediction = self.model.predict(features_scaled)[0]
-        score = self.model.decision_function(features_scaled)[0]
+        results = []
+        for data, row, score in zip(data_list, features, scores):
+            # Also check statistical anomalies
+            stat_result = self._statistical_detection(data, row)
+            
+            results.append({
+                "is_anomaly": bool(score < 0) or stat_result['is_anomaly'],
+                "anomaly_score": float(-score),  # Higher = more anomalous
+                "statistical_anomalies": stat_result['anomalies'],
+                "timestamp": timestamp
+            })
         
-        # Also check statistical anomalies
-        stat_result = self._statistical_detection(data, features[0])
+        return results
+    
+    def _cache_scaler_params(self):
+        """Keep the fitted scaler's mean and scale as float32 arrays"""
+        mean, scale = getattr(self.scaler, 'mean_', None), getattr(self.scaler, 'scale_', None)
+        if mean is None or scale is None:
+            self._scaler_params = None
+        else:
+            self._scaler_params = (mean.astype(FEATURE_DTYPE), scale.astype(FEATURE_DTYPE))
+    
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """Standardize features into the scratch buffer"""
+        if self._scaler_params is None or features.shape[1] != self._scratch.shape[1]:
+            return self.scaler.transform(features)
+        mean, scale = self._scaler_params
         
-        is_anomaly = prediction == -1 or stat_result['is_anomaly']
+        if len(features) > len(self._scratch):
+            self._scratch = np.empty((len(features), features.shape[1]), dtype=FEATURE_DTYPE)
+        # Same arithmetic as StandardScaler.transform, without its input
+        # validation and copy
+        scaled = self._scratch[:len(features)]
+        np.subtract(features, mean, out=scaled)
+        np.divide(scaled, scale, out=scaled)
+        return scaled
+    
+    def _cached_scores(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Score rows, running the forest only on vectors not seen recently"""
+        cache = self._score_cache
+        scores = np.empty(len(features_scaled), dtype=np.float64)
+        # Rows missing from the cache, grouped so duplicates are scored once
+        missing: Dict[bytes, List[int]] = {}
         
-        return {
-            "is_anomaly": is_anomaly,
-            "anomaly_score": float(-score),  # Higher = more anomalous
-            "statistical_anomalies": stat_result['anomalies'],
-            "timestamp": datetime.now().isoformat()
-        }
+        for i, row in enumerate(features_scaled):
+            key = row.tobytes()
+            score = cache.get(key)
+            if score is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                cache.move_to_end(key)
+                scores[i] = score
+        
+        if missing:
+            fresh = self._decision_function(features_scaled[[rows[0] for rows in missing.values()]])
+            for (key, rows), score in zip(missing.items(), fresh):
+                scores[rows] = score
+                cache[key] = float(score)
+            while len(cache) > SCORE_CACHE_SIZE:
+                cache.popitem(last=False)
+        
+        return scores
+    
+    def _decision_function(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Score scaled features, through onnxruntime when a session is loaded"""
+        if self.session is not None:
+            # The exported forest runs all trees in one native kernel
+            return self.session.run(
+                ['scores'], {'X': features_scaled.astype(np.float32, copy=False)}
+            )[0].ravel()
+        return self.model.decision_function(features_scaled)
+    
+    def export_onnx(self, path: str) -> bool:
+        """Export the trained forest to ONNX for onnxruntime inference"""
+        if not (self.is_trained and SKL2ONNX_AVAILABLE):
+            return False
+        
+        onx = convert_sklearn(
+            self.model,
+            initial_types=[('X', FloatTensorType([None, self.model.n_features_in_]))],
+            target_opset={'': 17, 'ai.onnx.ml': 3}
+        )
+        with open(f'{path}/{ONNX_MODEL_FILE}', 'wb') as f:
+            f.write(onx.SerializeToString())
+        return True
+    
+    def _load_onnx_session(self, path: str):
+        """Open an onnxruntime session for the exported forest, if present"""
+        onnx_path = f'{path}/{ONNX_MODEL_FILE}'
+        if not (ONNXRUNTIME_AVAILABLE and os.path.exists(onnx_path)):
+            return None
+        try:
+            return onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        except Exception as e:
+            print(f"Could not load ONNX anomaly model, using scikit-learn: {e}")
+            return None
     
     def _extract_features_batch(self, data_list: List[Dict]) -> tuple:
         """Extract numerical features from data"""
@@ -126,30 +284,83 @@ class AnomalyDetector:
             'day_of_week', 'is_business_hours'
         ]
         
-        features = []
-        for data in data_list:
-            feature_vector = [
+        # Fill a preallocated matrix row by row, parsing each timestamp once
+        features = np.empty((len(data_list), len(feature_names)), dtype=FEATURE_DTYPE)
+        for i, data in enumerate(data_list):
+            hour, day_of_week, business_hours = self._get_time_parts(data.get('timestamp'))
+            features[i] = (
                 float(data.get('cpu_usage', 0) or 0),
                 float(data.get('memory_usage', 0) or 0),
                 int(data.get('connection_count', 0) or 0),
                 int(data.get('file_access_count', 0) or 0),
                 int(data.get('process_count', 0) or 0),
-                self._get_hour(data.get('timestamp')),
-                self._get_day_of_week(data.get('timestamp')),
-                int(self._is_business_hours(data.get('timestamp')))
-            ]
-            features.append(feature_vector)
+                hour,
+                day_of_week,
+                int(business_hours)
+            )
         
-        return np.array(features), feature_names
+        return features, feature_names
+    
+    def save_baseline(self, path: str):
+        """Save the scaler, baseline statistics and feature names to one .npz"""
+        np.savez(
+            f'{path}/{BASELINE_FILE}',
+            scaler_mean=self.scaler.mean_,
+            scaler_scale=self.scaler.scale_,
+            scaler_samples=np.asarray(self.scaler.n_samples_seen_),
+            feature_names=np.array(self.feature_names),
+            **{k: np.asarray(v, dtype=FEATURE_DTYPE) for k, v in self.baseline_stats.items()}
+        )
+    
+    def _load_baseline(self, npz_path: str):
+        """Restore the scaler and baseline from a save_baseline() archive"""
+        with np.load(npz_path, allow_pickle=False) as archive:
+            self.scaler = StandardScaler()
+            self.scaler.mean_ = archive['scaler_mean']
+            self.scaler.scale_ = archive['scaler_scale']
+            self.scaler.var_ = self.scaler.scale_ ** 2
+            self.scaler.n_features_in_ = len(self.scaler.mean_)
+            self.scaler.n_samples_seen_ = archive['scaler_samples']
+            self.feature_names = archive['feature_names'].tolist()
+            self._set_baseline({
+                k: archive[k] for k in ('mean', 'std', 'min', 'max') if k in archive
+            })
+    
+    def _load_legacy_baseline(self, path: str):
+        """Load the scaler from joblib and the baseline from JSON files"""
+        self.scaler = joblib.load(f'{path}/anomaly_scaler.joblib')
+        
+        if os.path.exists(f'{path}/baseline_stats.json'):
+            with open(f'{path}/baseline_stats.json', 'r') as f:
+                self._set_baseline({
+                    k: np.asarray(v, dtype=FEATURE_DTYPE) for k, v in json.load(f).items()
+                })
+        
+        if os.path.exists(f'{path}/feature_names.json'):
+            with open(f'{path}/feature_names.json', 'r') as f:
+                self.feature_names = json.load(f)
     
     def _calculate_baseline(self, features: np.ndarray):
         """Calculate baseline statistics"""
-        self.baseline_stats = {
+        self._set_baseline({
             'mean': np.mean(features, axis=0),
             'std': np.std(features, axis=0),
             'min': np.min(features, axis=0),
             'max': np.max(features, axis=0)
-        }
+        })
+    
+    def _set_baseline(self, stats: Dict[str, np.ndarray]):
+        """Store baseline statistics and the arrays the z-score check uses"""
+        self.baseline_stats = stats
+        if 'mean' not in stats or 'std' not in stats:
+            # Summary stats from other training scripts carry no per-feature
+            # arrays, so there is nothing to score against
+            self._baseline_mean = self._baseline_std = self._baseline_varies = None
+            return
+        std = np.asarray(stats['std'], dtype=FEATURE_DTYPE)
+        self._baseline_mean = np.asarray(stats['mean'], dtype=FEATURE_DTYPE)
+        self._baseline_varies = std > 0
+        self._baseline_std = np.where(self._baseline_varies, std, FEATURE_DTYPE(1))
     
     def _statistical_detection(self, data: Dict, features: np.ndarray) -> Dict:
         """Statistical anomaly detection"""
@@ -171,37 +382,33 @@ class AnomalyDetector:
                 anomalies.append("High activity during off-hours")
         
         # Check against baseline if available
-        if self.baseline_stats:
-            for i, name in enumerate(self.feature_names):
-                if self.baseline_stats['std'][i] > 0:
-                    z_score = (features[i] - self.baseline_stats['mean'][i]) / self.baseline_stats['std'][i]
-                    if abs(z_score) > 3:
-                        anomalies.append(f"Statistical anomaly in {name} (z-score: {z_score:.2f})")
+        if self._baseline_mean is not None and self.feature_names:
+            # All z-scores at once; strings are only built for the outliers
+            n = min(len(self.feature_names), len(self._baseline_mean), len(features))
+            z_scores = (features[:n] - self._baseline_mean[:n]) / self._baseline_std[:n]
+            outliers = np.flatnonzero(self._baseline_varies[:n] & (np.abs(z_scores) > 3))
+            for i in outliers:
+                anomalies.append(
+                    f"Statistical anomaly in {self.feature_names[i]} (z-score: {z_scores[i]:.2f})"
+                )
         
         return {
             "is_anomaly": len(anomalies) > 0,
             "anomalies": anomalies
         }
     
-    def _get_hour(self, timestamp: str) -> int:
-        if not timestamp:
-            return datetime.now().hour
-        try:
-            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            return dt.hour
-        except:
-            return datetime.now().hour
-    
-    def _get_day_of_week(self, timestamp: str) -> int:
-        if not timestamp:
-            return datetime.now().weekday()
-        try:
-            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            return dt.weekday()
-        except:
-            return datetime.now().weekday()
+    def _get_time_parts(self, timestamp: str) -> tuple:
+        """Get (hour, day of week, is business hours), defaulting to now"""
+        if timestamp and isinstance(timestamp, str):
+            parts = _parse_time_parts(timestamp)
+            if parts is not None:
+                return parts
+        
+        # Missing or unparseable timestamps fall back to the current time,
+        # which must not be cached
+        now = datetime.now()
+        hour, day = now.hour, now.weekday()
+        return hour, day, day < 5 and 8 <= hour <= 18
     
     def _is_business_hours(self, timestamp: str) -> bool:
-        hour = self._get_hour(timestamp)
-        day = self._get_day_of_week(timestamp)
-        return day < 5 and 8 <= hour <= 18
+        return self._get_time_parts(timestamp)[2]
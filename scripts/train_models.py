@@ -5,7 +5,6 @@ Trains all ML models with sample or provided data
 """
 import os
 import sys
-import json
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -94,10 +93,12 @@ def train_anomaly_detector(data, output_dir):
     joblib.dump(detector.model, os.path.join(output_dir, 'isolation_forest.joblib'))
     joblib.dump(detector.scaler, os.path.join(output_dir, 'scaler.joblib'))
     
-    # Save baseline stats
-    with open(os.path.join(output_dir, 'baseline_stats.json'), 'w') as f:
-        stats = {k: v.tolist() for k, v in detector.baseline_stats.items()}
-        json.dump(stats, f)
+    # ONNX export for onnxruntime inference (needs skl2onnx)
+    if detector.export_onnx(output_dir):
+        print("Exported ONNX anomaly model")
+    
+    # Save scaler, baseline stats and feature names
+    detector.save_baseline(output_dir)
     
     print(f"Model saved to {output_dir}")
 
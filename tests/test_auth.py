@@ -2,7 +2,12 @@
 FortifAI Authentication Tests
 """
 import pytest
+import asyncio
+import hashlib
 import importlib
+import time
+from datetime import timedelta
+from unittest.mock import patch
 
 auth_service = importlib.import_module('backend.auth-service.main')
 AuthService = auth_service.AuthService
@@ -50,3 +55,56 @@ class TestAuthService:
         decoded = self.auth.decode_token("invalid_token_here")
         
         assert decoded is None
+    
+    def test_decode_token_cached(self):
+        """Test repeated decodes of the same token verify the signature once"""
+        token = self.auth.create_access_token({"sub": "cacheduser", "role": "viewer"})
+        with patch.object(auth_service.jwt, 'decode', wraps=auth_service.jwt.decode) as decode:
+            first = self.auth.decode_token(token)
+            second = self.auth.decode_token(token)
+        
+        assert decode.call_count == 1
+        assert first is not None
+        assert second.username == first.username == "cacheduser"
+        assert second.permissions == first.permissions
+    
+    def test_decode_token_cache_expired(self):
+        """Test an expired cache entry is not served"""
+        token = self.auth.create_access_token(
+            {"sub": "expireduser", "role": "viewer"}, expires_delta=timedelta(seconds=-10)
+        )
+        # Plant a stale entry as if the token had been cached while valid
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        token_data = auth_service.TokenData(username="expireduser", role="viewer")
+        auth_service._token_cache[cache_key] = (time.time() - 1, token_data)
+        
+        assert self.auth.decode_token(token) is None
+        assert cache_key not in auth_service._token_cache
+    
+    def test_create_user_existing_username(self):
+        """Test creating a user never overwrites an existing account"""
+        first = auth_service.UserCreate(
+            username="dupuser", email="first@example.com", password="first-password"
+        )
+        second = auth_service.UserCreate(
+            username="dupuser", email="second@example.com", password="second-password"
+        )
+        
+        assert self.auth.create_user(first) is not None
+        assert self.auth.create_user(second) is None
+        assert self.auth.register_user(second) is None
+        assert self.auth.authenticate_user("dupuser", "first-password") is not None
+        assert self.auth.authenticate_user("dupuser", "second-password") is None
+    
+    def test_default_admin_logged_only_when_created(self, caplog):
+        """Test losing the default admin race does not report a creation"""
+        caplog.set_level("INFO", logger=auth_service.logger.name)
+        with patch.object(auth_service.auth_service, "get_user", return_value=None), \
+                patch.object(auth_service.auth_service, "create_user", return_value=None):
+            asyncio.run(auth_service.create_default_admin())
+        assert "Default admin user created" not in caplog.text
+        
+        with patch.object(auth_service.auth_service, "get_user", return_value=None), \
+                patch.object(auth_service.auth_service, "create_user", return_value=object()):
+            asyncio.run(auth_service.create_default_admin())
+        assert "Default admin user created" in caplog.text
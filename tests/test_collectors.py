@@ -5,13 +5,22 @@ import pytest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import asyncio
+import subprocess
+import time
+import psutil
+import importlib
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'data-collector'))
 
 from collectors.process_collector import ProcessCollector
 from collectors.network_collector import NetworkCollector
+from collectors.process_snapshot import get_process_snapshot, ProcessSnapshot, PROCFS_AVAILABLE
 from collectors.file_collector import FileLogCollector
+from collectors import file_collector
+
+collector_main = importlib.import_module('backend.data-collector.main')
 
 
 class TestProcessCollector:
@@ -59,6 +68,45 @@ class TestProcessCollector:
             'memory_percent': 10
         }
         assert self.collector._is_suspicious(pinfo)
+    
+    def test_process_snapshot_shared(self):
+        """Test collectors in one cycle share a process snapshot"""
+        snapshot = get_process_snapshot()
+        assert get_process_snapshot() is snapshot
+        assert os.getpid() in snapshot.processes
+        assert get_process_snapshot(max_age=0) is not snapshot
+    
+    def test_process_snapshot_matches_psutil(self):
+        """Test snapshot fields agree with psutil for this process"""
+        info = ProcessSnapshot().get(os.getpid())
+        proc = psutil.Process()
+        
+        assert info['name'] == proc.name()
+        assert info['username'] == proc.username()
+        assert info['cmdline'] == proc.cmdline()
+        assert abs(info['create_time'] - proc.create_time()) < 0.05
+    
+    @pytest.mark.skipif(not PROCFS_AVAILABLE, reason="reads /proc directly only on Linux")
+    def test_process_snapshot_unusual_comm(self):
+        """Test a process name containing spaces and parentheses is read whole"""
+        # PR_SET_NAME (15) renames the child itself; comm is only writable
+        # through /proc from within the process
+        code = (
+            "import ctypes, sys, time; ctypes.CDLL(None).prctl(15, b'a b) (c', 0, 0, 0); "
+            "print('ready', flush=True); time.sleep(30)"
+        )
+        child = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, text=True)
+        try:
+            assert child.stdout.readline().strip() == 'ready'
+            info = ProcessSnapshot().get(child.pid)
+            
+            assert info['name'] == 'a b) (c'
+            assert info['cmdline'] == [sys.executable, '-c', code]
+            assert abs(info['create_time'] - psutil.Process(child.pid).create_time()) < 0.05
+        finally:
+            child.kill()
+            child.wait()
+            child.stdout.close()
 
 
 class TestNetworkCollector:
@@ -114,3 +162,209 @@ class TestFileLogCollector:
             paths = collector._get_watched_paths()
             assert isinstance(paths, list)
 
+
+
+def _wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.mark.skipif(not file_collector.INOTIFY_AVAILABLE, reason="inotify requires Linux")
+class TestInotifyWatcher:
+    """Tests for InotifyWatcher"""
+    
+    def setup_method(self):
+        self.events = []
+    
+    def _start(self, root):
+        self.watcher = file_collector.InotifyWatcher([str(root)], self._record)
+        self.watcher.start()
+    
+    def teardown_method(self):
+        if hasattr(self, 'watcher'):
+            self.watcher.stop()
+            self.watcher.join()
+    
+    def _record(self, event_type, path, dest_path=None):
+        self.events.append((event_type, path, dest_path))
+    
+    def _types(self):
+        return [event[0] for event in self.events]
+    
+    def test_create_modify_delete(self, tmp_path):
+        """Test a burst of writes is reported as one modify between create and delete"""
+        self._start(tmp_path)
+        path = str(tmp_path / 'report.txt')
+        
+        with open(path, 'w') as f:
+            for _ in range(10):
+                f.write('data')
+                f.flush()
+        assert _wait_for(lambda: 'file_modified' in self._types())
+        os.remove(path)
+        assert _wait_for(lambda: 'file_deleted' in self._types())
+        
+        assert self.events == [
+            ('file_created', path, None),
+            ('file_modified', path, None),
+            ('file_deleted', path, None)
+        ]
+    
+    def test_move_within_tree(self, tmp_path):
+        """Test a rename inside the watched tree is one move event"""
+        src = tmp_path / 'a.txt'
+        src.write_text('x')
+        self._start(tmp_path)
+        
+        os.rename(src, tmp_path / 'b.txt')
+        assert _wait_for(lambda: self.events)
+        time.sleep(0.1)
+        assert self.events == [('file_moved', str(src), str(tmp_path / 'b.txt'))]
+    
+    def test_move_out_of_tree(self, tmp_path):
+        """Test files and directories moved out of the tree stop being watched"""
+        watched, outside = tmp_path / 'watched', tmp_path / 'outside'
+        (watched / 'sub').mkdir(parents=True)
+        outside.mkdir()
+        (watched / 'a.txt').write_text('x')
+        self._start(watched)
+        assert str(watched / 'sub') in self.watcher._wd_paths.values()
+        
+        os.rename(watched / 'a.txt', outside / 'a.txt')
+        os.rename(watched / 'sub', outside / 'sub')
+        assert _wait_for(lambda: self.events)
+        assert _wait_for(lambda: str(watched / 'sub') not in self.watcher._wd_paths.values())
+        assert self.events == [('file_deleted', str(watched / 'a.txt'), None)]
+    
+    def test_move_split_across_reads(self, tmp_path):
+        """Test a move whose halves arrive in separate buffers is still paired"""
+        self.watcher = file_collector.InotifyWatcher([str(tmp_path)], self._record)
+        wd = next(iter(self.watcher._wd_paths))
+        
+        def event(mask, name):
+            name = name.encode() + b'\0' * 4
+            return file_collector._INOTIFY_EVENT.pack(wd, mask, 7, len(name)) + name
+        
+        self.watcher._dispatch(event(file_collector.IN_MOVED_FROM, 'a.txt'))
+        self.watcher._dispatch(event(file_collector.IN_MOVED_TO, 'b.txt'))
+        assert self.events == [('file_moved', str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt'))]
+    
+    def test_stop_is_prompt(self, tmp_path):
+        """Test stop() wakes the idle reader thread immediately"""
+        self._start(tmp_path)
+        started = time.monotonic()
+        self.watcher.stop()
+        self.watcher.join()
+        del self.watcher
+        assert time.monotonic() - started < 1.0
+    
+    def test_stop_twice(self, tmp_path):
+        """Test stopping the collector again leaves other fds untouched"""
+        with patch.object(file_collector.FileLogCollector, '_get_watched_paths', return_value=[str(tmp_path)]):
+            collector = FileLogCollector()
+        watcher = collector.observer
+        assert isinstance(watcher, file_collector.InotifyWatcher)
+        
+        collector.stop()
+        assert collector.observer is None
+        assert watcher.fd == -1
+        
+        # Anything opened now may reuse the closed fd numbers
+        read_fd, write_fd = os.pipe()
+        try:
+            collector.stop()
+            watcher.stop()
+            watcher.join()
+            os.fstat(read_fd)
+            os.fstat(write_fd)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+
+class TestDataCollectorService:
+    """Tests for DataCollectorService"""
+    
+    def setup_method(self):
+        with patch.object(FileLogCollector, '_start_observer'):
+            self.service = collector_main.DataCollectorService()
+        self.service.redis_client = None
+    
+    def test_drop_duplicates_within_cycle(self):
+        """Test identical logs in one cycle are forwarded once"""
+        logs = [
+            {'event_type': 'connection', 'remote_port': 4444, 'timestamp': 't1'},
+            {'event_type': 'connection', 'remote_port': 4444, 'timestamp': 't2'},
+            {'event_type': 'connection', 'remote_port': 80, 'timestamp': 't3'}
+        ]
+        unique = self.service._drop_duplicates(logs)
+        assert unique == [logs[0], logs[2]]
+        assert self.service.stats['total_duplicates'] == 1
+    
+    def test_drop_duplicates_only_after_forwarded(self):
+        """Test logs the ML engine never accepted are not suppressed"""
+        log = {'event_type': 'connection', 'remote_port': 4444}
+        assert self.service._drop_duplicates([log]) == [log]
+        
+        repeat = dict(log)
+        assert self.service._drop_duplicates([repeat]) == [repeat]
+        self.service._mark_forwarded([repeat])
+        assert self.service._drop_duplicates([dict(log)]) == []
+    
+    def test_drop_duplicates_expire(self):
+        """Test a persisting log is forwarded again after the TTL"""
+        log = {'event_type': 'connection', 'remote_port': 4444}
+        self.service._mark_forwarded(self.service._drop_duplicates([log]))
+        assert self.service._drop_duplicates([dict(log)]) == []
+        
+        for h in self.service._seen_logs:
+            self.service._seen_logs[h] -= collector_main.DEDUP_TTL + 1
+        repeat = dict(log)
+        assert self.service._drop_duplicates([repeat]) == [repeat]
+    
+    def test_adjust_batch_size(self):
+        """Test batches double when the ML engine is fast and halve when slow, within bounds"""
+        self.service.batch_size = 50
+        self.service.ml_latency_target = 2.0
+        
+        self.service._adjust_batch_size(0.1)
+        assert self.service.batch_size == 100
+        for _ in range(5):
+            self.service._adjust_batch_size(0.1)
+        assert self.service.batch_size == collector_main.MAX_BATCH_SIZE
+        
+        # Inside the band between half the target and the target
+        self.service._ml_latency = None
+        self.service._adjust_batch_size(1.5)
+        assert self.service.batch_size == collector_main.MAX_BATCH_SIZE
+        
+        self.service._ml_latency = None
+        self.service._adjust_batch_size(5.0)
+        assert self.service.batch_size == collector_main.MAX_BATCH_SIZE // 2
+        for _ in range(10):
+            self.service._adjust_batch_size(5.0)
+        assert self.service.batch_size == collector_main.MIN_BATCH_SIZE
+    
+    def test_full_redis_queue_keeps_alerts(self):
+        """Test a full write queue drops the log cache but still sends alerts"""
+        self.service.redis_client = MagicMock()
+        logs = [{'collection_id': 'c-1', 'is_suspicious': True}]
+        alerts = [{'id': 'alert-1'}]
+        
+        async def queue_when_full():
+            self.service._redis_queue = asyncio.Queue(maxsize=1)
+            self.service._redis_queue.put_nowait(([], []))
+            await self.service._queue_redis_writes(logs, alerts)
+        
+        asyncio.run(queue_when_full())
+        redis_client = self.service.redis_client
+        redis_client.set_many.assert_not_called()
+        redis_client.cache_and_publish_alerts.assert_called_once()
+        assert redis_client.cache_and_publish_alerts.call_args[0][0] == alerts
+        redis_client.publish.assert_called_once()
+        redis_client.pipeline.return_value.execute.assert_called_once()
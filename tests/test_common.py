@@ -0,0 +1,49 @@
+"""
+FortifAI Common Utility Tests
+"""
+import pytest
+from datetime import datetime
+
+from backend.common.redis_client import _json_dumps, _json_loads
+from backend.common.utils import parse_timestamp
+
+
+class TestParseTimestamp:
+    """Tests for parse_timestamp"""
+    
+    def test_naive_layouts(self):
+        """Test the layouts without a zone parse as naive datetimes"""
+        assert parse_timestamp("2024-01-02T03:04:05.123456") == datetime(2024, 1, 2, 3, 4, 5, 123456)
+        assert parse_timestamp("2024-01-02T03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+        assert parse_timestamp("2024-01-02 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+        assert parse_timestamp("2024-01-02") == datetime(2024, 1, 2)
+    
+    def test_utc_suffix(self):
+        """Test a trailing Z parses as naive UTC"""
+        parsed = parse_timestamp("2024-01-02T03:04:05.5Z")
+        assert parsed == datetime(2024, 1, 2, 3, 4, 5, 500000)
+        assert parsed.tzinfo is None
+    
+    def test_offset_converted_to_naive_utc(self):
+        """Test a UTC offset is applied and dropped, so results stay comparable"""
+        parsed = parse_timestamp("2024-01-02T03:04:05+02:00")
+        assert parsed == datetime(2024, 1, 2, 1, 4, 5)
+        assert parsed.tzinfo is None
+        assert parsed < parse_timestamp("2024-01-02T02:00:00Z")
+    
+    def test_invalid(self):
+        """Test unparseable strings return None"""
+        assert parse_timestamp("not a timestamp") is None
+
+
+class TestJsonDumps:
+    """Tests for the Redis client's JSON serializer"""
+    
+    def test_non_str_keys(self):
+        """Test int keys serialize instead of raising TypeError"""
+        assert _json_loads(_json_dumps({80: "http", "host": "a"})) == {"80": "http", "host": "a"}
+    
+    def test_fallback_to_stdlib(self):
+        """Test values orjson refuses still serialize through json"""
+        big = 2 ** 70
+        assert _json_loads(_json_dumps({big: 1})) == {str(big): 1}
@@ -82,6 +82,32 @@ class TestAnomalyDetector:
             'memory_usage': 99
         })
         assert 'is_anomaly' in anomaly_result
+    
+    def test_score_cache(self):
+        """Test repeated feature vectors are scored by the forest only once"""
+        training_data = [
+            {'cpu_usage': 20, 'memory_usage': 30},
+            {'cpu_usage': 25, 'memory_usage': 35},
+        ] * 20
+        self.detector.fit(training_data)
+        
+        timestamp = '2024-01-01T10:00:00'
+        idle = {'cpu_usage': 21, 'memory_usage': 31, 'timestamp': timestamp}
+        busy = {'cpu_usage': 80, 'memory_usage': 70, 'timestamp': timestamp}
+        
+        with patch.object(self.detector, '_decision_function',
+                          wraps=self.detector._decision_function) as scorer:
+            first = self.detector.detect_batch([idle, dict(idle), busy])
+            assert scorer.call_count == 1
+            assert len(scorer.call_args[0][0]) == 2
+            assert first[0]['anomaly_score'] == first[1]['anomaly_score']
+            
+            second = self.detector.detect_batch([busy, idle])
+            assert scorer.call_count == 1
+            assert second[0]['anomaly_score'] == first[2]['anomaly_score']
+        
+        self.detector.fit(training_data)
+        assert len(self.detector._score_cache) == 0
 
 
 class TestUserBehaviorAnalytics: